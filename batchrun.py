@@ -0,0 +1,65 @@
+"""Runs lots of headless playthroughs of a game at once, one worker process per core, for balancing and bot testing.
+
+python batchrun.py game:game --runs 100 --ticks 3600
+python batchrun.py game:game --runs 1000 --script inputs.json --metrics mybot:metrics --out results.jsonl
+python batchrun.py game:game --seeds 1 2 3 --policy mybot:policy --workers 4
+
+The target is "module:name" of an App class, a function returning an App, or an App the module builds when imported.
+Every run prints one JSON line as soon as it finishes, and the totals go to stderr at the end."""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+# keeps pygame's banner out of the JSON lines on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs headless Apps on a process pool and prints one JSON line per run")
+    parser.add_argument("target", help='the App to run, as "module:name"')
+    parser.add_argument("--runs", type=int, default=10, help="how many runs, seeded 0, 1, 2... (ignored with --seeds)")
+    parser.add_argument("--seeds", type=int, nargs="+", help="run once with each of these seeds")
+    parser.add_argument("--ticks", type=int, default=3600, help="simulation ticks per run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes to run on (default: one per core)")
+    parser.add_argument("--script", help="JSON file of [tick, key, hold] inputs every run plays")
+    parser.add_argument("--policy", help='"module:name" of a policy(app) that returns each tick\'s input events')
+    parser.add_argument("--metrics", help='"module:name" of a metrics(app) that returns a dict to report after each run')
+    parser.add_argument("--out", help="append the results to this file too")
+    args = parser.parse_args()
+
+    if args.script and args.policy:
+        parser.error("use either --script or --policy")
+
+    seeds = args.seeds if args.seeds else range(args.runs)
+    jobs = [{"seed": seed, "script": os.path.abspath(args.script)} if args.script else {"seed": seed} for seed in seeds]
+
+    # the workers import the target themselves, so it has to be importable from here
+    sys.path.insert(0, os.getcwd())
+
+    start = time.perf_counter()
+    ticks = errors = 0
+    out = open(args.out, "a") if args.out else None
+    try:
+        for result in engine.run_batch(args.target, jobs, ticks=args.ticks, workers=args.workers, policy=args.policy, metrics=args.metrics):
+            ticks += result.get("ticks", 0)
+            errors += "error" in result
+
+            line = json.dumps(result)
+            print(line, flush=True)
+            if out:
+                out.write(line + "\n")
+    finally:
+        if out:
+            out.close()
+
+    wall = time.perf_counter() - start
+    print(f"{len(jobs)} runs ({errors} failed), {ticks} ticks in {wall:.1f} s: {ticks / wall:.0f} ticks/s on {args.workers} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Headless benchmarks for the engine's hot paths.
+
+python bench.py                          run every scenario at the default sizes
+python bench.py bullets obstacles -n 100 500 2000 --frames 600
+python bench.py --out new.jsonl --compare old.jsonl
+
+Every result is one JSON line, so runs from different commits can be compared with --compare."""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+# has to happen before pygame gets initialized
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# keeps pygame's banner out of the JSON lines on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+import random
+import engine
+
+
+class ScriptedKeys:
+    """Stands in for `pygame.key.get_pressed()`, with the keys held changing on a fixed pattern"""
+    def __init__(self, pattern: list, hold: int = 15):
+        self.pattern = pattern
+        self.hold = hold
+        self.frame = 0
+
+    def advance(self):
+        self.frame += 1
+
+    def __getitem__(self, key):
+        return key in self.pattern[(self.frame // self.hold) % len(self.pattern)]
+
+
+class BenchApp(engine.App):
+    def __init__(self, frames: int):
+        super().__init__(title="bench", framerate=0, show_fps=False, profile_frames=frames)
+        self.seed = 0
+
+    def ready(self):
+        random.seed(self.seed)
+
+
+class Cats(engine.Scene):
+    """Bouncing Projectiles, one object each, like the old Cats scene"""
+    def __init__(self, app, n):
+        super().__init__(app, "cats")
+        self.n = n
+
+    def ready(self):
+        for _ in range(self.n):
+            pos = random.randint(100, self.app.width-100), random.randint(100, self.app.height-100)
+            velocity = random.randint(-10, 10), random.randint(-10, 10)
+            self.blits.append(engine.Projectile(self.app, image="catsmirk.png", pos=pos, velocity=velocity, bounce=True))
+
+    def loop(self, key):
+        self.app.fill((64, 0, 0))
+        for sprite in self.blits:
+            sprite.step()
+            sprite.blit()
+
+
+class Swarm(engine.Scene):
+    """The same bouncing cats, but in a ProjectileSwarm"""
+    def __init__(self, app, n):
+        super().__init__(app, "swarm")
+        self.n = n
+
+    def ready(self):
+        self.swarm = engine.ProjectileSwarm(self.app, capacity=self.n)
+        for _ in range(self.n):
+            pos = random.randint(100, self.app.width-100), random.randint(100, self.app.height-100)
+            velocity = random.randint(-10, 10), random.randint(-10, 10)
+            self.swarm.add(image="catsmirk.png", pos=pos, velocity=velocity, bounce=True)
+        self.blits = [self.swarm]
+
+    def loop(self, key):
+        self.app.fill((64, 0, 0))
+        engine.AUTO_blit(self.blits)
+
+
+class Obstacles(engine.Scene):
+    """A player walking around `n` Obstacles with Sprite.move"""
+    def __init__(self, app, n):
+        super().__init__(app, "obstacles")
+        self.n = n
+
+    def ready(self):
+        self.player = engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.width//2, self.app.height//3))
+        self.blits.append(self.player)
+        self.keys = ScriptedKeys([{pygame.K_RIGHT}, {pygame.K_DOWN}, {pygame.K_LEFT, pygame.K_DOWN}, {pygame.K_UP}, {pygame.K_LEFT}])
+
+        team = engine.Team(self.app, "collision", [self.player], cell_size=64)
+        for _ in range(self.n):
+            size = random.randint(5, 60), random.randint(5, 30)
+            pos = random.randint(1, self.app.width-size[0]-1), random.randint(1, self.app.height-size[1]-1)
+            obstacle = engine.Obstacle(self.app, color=(200, 0, 0), size=size, pos=pos)
+            self.blits.append(obstacle)
+            team.add_member(obstacle)
+
+    def loop(self, key):
+        self.app.fill((0, 15, 64))
+        engine.KEYS_move(self.keys, self.player, 10)
+        self.keys.advance()
+        self.player.restrict()
+        engine.AUTO_blit(self.blits)
+
+
+class Bullets(engine.Scene):
+    """`n` targets, with a handful of shooters firing a Bullet every frame"""
+    def __init__(self, app, n):
+        super().__init__(app, "bullets")
+        self.n = n
+
+    def ready(self):
+        self.shooters = []
+        for i in range(8):
+            shooter = engine.Sprite(self.app, image="catsmirk.png", pos=(60 + i * 110, self.app.height - 40))
+            self.shooters.append(shooter)
+            self.blits.append(shooter)
+
+        for _ in range(self.n):
+            pos = random.randint(0, self.app.width-32), random.randint(0, self.app.height//2)
+            self.blits.append(Target(self.app, image="catsmirk.png", pos=pos))
+
+    def loop(self, key):
+        self.app.fill((0, 15, 64))
+        for shooter in self.shooters:
+            velocity = random.randint(-3, 3), -10
+            self.blits.append(self.app.bullets.acquire(shooter, image="catsmirk.png", velocity=velocity, damage=1))
+        engine.AUTO_blit(self.blits)
+
+
+class Target(engine.Sprite):
+    health = 0
+
+    def take_damage(self, damage):
+        self.health -= damage
+
+
+class Menu(engine.Menu):
+    """A Menu with `n` entries in a scrolling ListView, moving down one entry every frame"""
+    def __init__(self, app, n):
+        names = [f"Entry number {i}" for i in range(n)]
+        super().__init__(app, "menu", names, [None] * n)
+
+    def loop(self, key):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=self.key_forward))
+        super().loop(key)
+
+
+SCENARIOS = {
+    "cats": (Cats, [200, 1000]),
+    "swarm": (Swarm, [200, 1000, 10000]),
+    "obstacles": (Obstacles, [100, 1000, 5000]),
+    "bullets": (Bullets, [100, 500, 2000]),
+    "menu": (Menu, [10, 100, 500]),
+}
+
+
+def run(name: str, n: int, frames: int, warmup: int, trace: bool) -> dict:
+    scene_type = SCENARIOS[name][0]
+    app = BenchApp(warmup + frames)
+    app.first_scene = scene_type(app, n)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    if trace:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    app.run(ticks=warmup + frames)
+    wall = time.perf_counter() - start
+
+    result = {
+        "scenario": name,
+        "n": n,
+        "frames": frames,
+        "wall_s": wall,
+        "alloc_blocks": sys.getallocatedblocks() - blocks,
+        "gc_collections": sum(stat["collections"] for stat in gc.get_stats()) - collections,
+    }
+    if trace:
+        result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    rows = app.profiler.rows()[warmup:]
+    totals = [row["total_ms"] / 1000 for row in rows]
+    result["fps"] = len(totals) / sum(totals) if totals else 0.0
+    result["frame_ms"] = app.profiler.percentiles(totals) | {"mean": sum(totals) / len(totals) * 1000 if totals else 0.0}
+    result["phase_ms"] = {
+        phase: sum(row[f"{phase}_ms"] for row in rows) / len(rows) if rows else 0.0
+        for phase in engine.PROFILE_PHASES
+    }
+    return result
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(__file__) or None).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {"commit": commit, "python": platform.python_version(), "pygame": pygame.version.ver, "machine": platform.machine()}
+
+
+def compare(old_path: str, results: list):
+    with open(old_path) as file:
+        old = {(r["scenario"], r["n"]): r for r in (json.loads(line) for line in file if line.startswith("{")) if "scenario" in r}
+
+    print(f"{'scenario':<12}{'n':>7}{'old p50':>10}{'new p50':>10}{'old fps':>10}{'new fps':>10}{'change':>9}", file=sys.stderr)
+    for result in results:
+        before = old.get((result["scenario"], result["n"]))
+        if not before:
+            continue
+        change = before["frame_ms"]["p50"] / result["frame_ms"]["p50"] - 1 if result["frame_ms"]["p50"] else 0.0
+        print(
+            f"{result['scenario']:<12}{result['n']:>7}{before['frame_ms']['p50']:>10.2f}{result['frame_ms']['p50']:>10.2f}"
+            f"{before['fps']:>10.1f}{result['fps']:>10.1f}{change:>+9.1%}",
+            file=sys.stderr
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs engine scenarios headlessly and prints one JSON line per result")
+    parser.add_argument("scenarios", nargs="*", help=f"which scenarios to run, out of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("-n", type=int, nargs="+", help="sizes to run each scenario at (default: per scenario)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report peak traced memory (slows everything down)")
+    parser.add_argument("--out", help="append the results to this file too")
+    parser.add_argument("--compare", help="a previous results file to compare against")
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}'")
+
+    env = environment()
+    results = []
+
+    for name in args.scenarios or SCENARIOS:
+        for n in args.n or SCENARIOS[name][1]:
+            result = run(name, n, args.frames, args.warmup, args.tracemalloc) | env
+            results.append(result)
+
+            line = json.dumps(result)
+            print(line, flush=True)
+            if args.out:
+                with open(args.out, "a") as file:
+                    file.write(line + "\n")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,304 @@
+import time
+_IMPORT_START = time.perf_counter() # the startup timeline counts from here
+
 import pygame
 import os
+import io
+import mmap
 import random
+import struct
+import zlib
+import json
+import socket
+import csv
+import sys
+import array
+import weakref
+import importlib
+import traceback
+import multiprocessing
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # only needed for ProjectileSwarm
+
+_IMPORT_END = time.perf_counter()
 
 
 def _not_looping(key: int):
     print(f"This function should not be called! Key: {key}")
 
 DEFAULT_COLOR = (50, 50, 50)
+DEFAULT_TEXT_COLOR = (30, 10, 100)
+DIRTY_RETAINED_MAX = 1024 # draws dirty rect mode remembers across frames that clear nothing, before it gives up and redraws everything
+
+
+class LRUCache:
+    """Cache that forgets its least recently used entries once their total size goes over `max_size`.
+    `weigh` returns the size of a value, every value counts as 1 if you don't pass it"""
+    def __init__(self, max_size: int, weigh = None):
+        self.max_size = max_size
+        self.weigh = weigh
+        self.entries = OrderedDict() # key -> (value, size)
+        self.size = 0
+        self.reserved = 0 # counts against `max_size` too, but is never evicted (like atlas pages)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default = None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+
+        size = self.weigh(value) if self.weigh else 1
+        self.entries[key] = (value, size)
+        self.size += size
+        self._evict()
+
+    def reserve(self, size: int):
+        """Takes `size` off the budget (or gives it back if negative), evicting entries if that goes over it"""
+        self.reserved += size
+        self._evict()
+
+    def _evict(self):
+        # never evict the entry that was just added, even if it's bigger than the whole budget
+        while self.size + self.reserved > self.max_size and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.size -= old_size
+            self.evictions += 1
+
+    def remove(self, key):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+            return True
+        return False
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size": self.size,
+            "reserved": self.reserved,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        for value, _ in self.entries.values():
+            yield value
+
+
+def _surface_bytes(entry: tuple) -> int:
+    surface = entry[0]
+    if surface.get_parent():
+        # an atlas image, its pitch is the whole page's and the page gets counted on its own
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+    return surface.get_pitch() * surface.get_height()
+
+
+PROFILE_PHASES = ("events", "loop", "collision", "blit", "overlay", "present", "tick")
+
+
+def count_entities(blits: list) -> Counter:
+    """Counts the items in `blits` by type name, counting what's inside ProjectileSwarms too"""
+    counts = Counter()
+    for item in blits:
+        if isinstance(item, ProjectileSwarm):
+            counts["SwarmProjectile"] += len(item)
+        else:
+            counts[type(item).__name__] += 1
+    return counts
+
+
+class Profiler:
+    """Times every phase of every frame into a ring buffer of the last `size` frames.
+    The App times events, loop, overlay, present and tick itself, AUTO_blit adds collision and blit"""
+    def __init__(self, app: "App", size: int = 600):
+        self.app = app
+        self.size = size
+
+        self.frames = 0 # total frames recorded, the buffer only has the last `size` of them
+        self.totals = [0.0] * size
+        self.phases = {phase: [0.0] * size for phase in PROFILE_PHASES}
+        self.scenes = [None] * size
+        self.entities = [0] * size
+
+        self._current = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self._frame_start = None
+
+        self._overlay = None
+        self._overlay_font = None
+        self._overlay_frame = -1
+
+    def begin_frame(self):
+        for phase in self._current:
+            self._current[phase] = 0.0
+        self._frame_start = time.perf_counter()
+
+    def add(self, phase: str, seconds: float):
+        self._current[phase] += seconds
+
+    @contextmanager
+    def phase(self, phase: str):
+        """Use with `with` to time a block of your own code as one of the phases"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[phase] += time.perf_counter() - start
+
+    def end_frame(self):
+        if self._frame_start is None:
+            return
+
+        i = self.frames % self.size
+        self.totals[i] = time.perf_counter() - self._frame_start
+
+        # collision and blit happen inside the loop, don't count them twice
+        current = self._current
+        current["loop"] = max(current["loop"] - current["collision"] - current["blit"], 0.0)
+        for phase, seconds in current.items():
+            self.phases[phase][i] = seconds
+
+        scene = self.app.scene
+        self.scenes[i] = getattr(scene, "name", None) or type(scene).__name__
+        blits = getattr(scene, "blits", None)
+        self.entities[i] = len(blits) if blits else 0
+
+        self.frames += 1
+        self._frame_start = None
+
+    def _order(self) -> list:
+        """Buffer indices from the oldest frame to the newest"""
+        if self.frames <= self.size:
+            return list(range(self.frames))
+        start = self.frames % self.size
+        return list(range(start, self.size)) + list(range(start))
+
+    def percentiles(self, values: list = None) -> dict:
+        """p50/p95/p99/max of the frame times in milliseconds"""
+        if values is None:
+            values = [self.totals[i] for i in self._order()]
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        values = sorted(values)
+        last = len(values) - 1
+        return {
+            f"p{p}": values[round(p / 100 * last)] * 1000
+            for p in (50, 95, 99)
+        } | {"max": values[-1] * 1000}
+
+    def summary(self) -> dict:
+        order = self._order()
+        count = len(order)
+        total = sum(self.totals[i] for i in order)
+
+        scene = self.app.scene
+        return {
+            "frames": self.frames,
+            "fps": count / total if total else 0.0,
+            "frame_ms": self.percentiles() | {"mean": total / count * 1000 if count else 0.0},
+            "phase_ms": {
+                phase: sum(times[i] for i in order) / count * 1000 if count else 0.0
+                for phase, times in self.phases.items()
+            },
+            "scenes": dict(Counter(self.scenes[i] for i in order)),
+            "entities": dict(count_entities(getattr(scene, "blits", None) or [])),
+        }
+
+    def rows(self) -> list:
+        """The buffered frames as dicts, oldest first"""
+        first = self.frames - min(self.frames, self.size)
+        return [
+            {
+                "frame": first + n,
+                "scene": self.scenes[i],
+                "entities": self.entities[i],
+                "total_ms": self.totals[i] * 1000,
+            } | {f"{phase}_ms": times[i] * 1000 for phase, times in self.phases.items()}
+            for n, i in enumerate(self._order())
+        ]
+
+    def export(self, path: str):
+        """Writes the buffered frames to `path`, as CSV if it ends with .csv and JSON otherwise"""
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def export_json(self, path: str):
+        with open(path, "w") as file:
+            json.dump({"summary": self.summary(), "frames": self.rows()}, file, indent=1)
+
+    def export_csv(self, path: str):
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, ["frame", "scene", "entities", "total_ms"] + [f"{phase}_ms" for phase in PROFILE_PHASES])
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    def draw(self, pos: tuple = (5, 5), every: int = 15):
+        """Draws the overlay, re-rendering it every `every` frames"""
+        if self._overlay is None or self.frames - self._overlay_frame >= every:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self.frames
+
+        self.app.blit(self._overlay, pos)
+
+    def _render_overlay(self) -> pygame.Surface:
+        if not self._overlay_font:
+            self.app.init_font()
+            self._overlay_font = pygame.font.Font(None, 22)
+
+        summary = self.summary()
+        frame_ms = summary["frame_ms"]
+        phase_ms = summary["phase_ms"]
+        entities = summary["entities"]
+
+        fps = self.app.clock.get_fps()
+        if fps == float("inf"):
+            # the clock can't tell when uncapped frames take under a millisecond, the profiler can
+            fps = 1000 / frame_ms["p50"] if frame_ms["p50"] else 0
+
+        lines = [
+            f"{int(fps)} fps   {frame_ms['p50']:.1f} / {frame_ms['p95']:.1f} / {frame_ms['p99']:.1f} ms",
+            "  ".join(f"{phase} {phase_ms[phase]:.1f}" for phase in ("loop", "collision", "blit", "present")),
+            f"{sum(entities.values())} entities: " + ", ".join(f"{name} {count}" for name, count in Counter(entities).most_common(3)),
+        ]
+
+        line_height = self._overlay_font.get_linesize()
+        surface = pygame.Surface((340, line_height * len(lines) + 6))
+        for i, line in enumerate(lines):
+            surface.blit(self._overlay_font.render(line, True, (240, 240, 240)), (4, 3 + line_height * i))
+        return surface
 
 
 class App:
@@ -16,6 +308,7 @@ class App:
         title: str = "game",
         logo_filename: str = None,
         size: tuple = (960, 720),
+        world_size: tuple = None,
         framerate: int = 60,
         show_fps: bool = True,
         run_dir: str = None, 
@@ -23,13 +316,76 @@ class App:
         image_subdir: str = "images",
         sound_subdir: str = "sounds",
         font_subdir: str = "fonts",
+        map_subdir: str = "maps",
+        atlas_subdir: str = "atlas",
+        bundle_filename: str = "assets.bundle",
+        image_cache_size: int = 64 * 1024 * 1024,
+        text_cache_size: int = 1024,
+        dirty_rects: bool = False,
+        dirty_limit: float = 0.5,
+        profile_frames: int = 600,
+        profile_export: str = None,
+        tick_rate: int = None,
+        max_frame_ticks: int = 5,
+        headless: bool = False,
+        loader_threads: int = 4,
+        seed: int = None,
+        sound_channels: int = 16,
+        sound_instances: int = 4,
+        lazy_init: bool = False,
+        startup_report: bool = False,
     ):
+        # (label, start, duration) of everything that happened before the first frame, in seconds since engine was imported
+        # `startup_report` prints it once the first frame is on screen
+        self.timeline = [("import engine", 0.0, _IMPORT_END - _IMPORT_START), ("App created", time.perf_counter() - _IMPORT_START, 0.0)]
+        self.startup_report = startup_report
+        self.started = False
+
+        # with `lazy_init` only the display starts up front: fonts and the mixer start the first time they're used,
+        # and the window shows a first frame before `ready` runs
+        self.lazy_init = lazy_init
+        self._font_default = None
+        self._font_main = None
+
         self.title = title
         self.logo_filename = logo_filename
         self.width, self.height = self.size = size
+
+        # the world can be bigger than the window, set `camera` to a Camera to move around it
+        self.world_width, self.world_height = self.world_size = world_size or size
+        self.camera = None
         self.framerate = framerate
         self.show_fps = show_fps
 
+        # with a `tick_rate`, scenes `tick` that many times per second no matter the framerate, and `draw` once per frame
+        # headless runs one tick per frame as fast as possible, without a window, `draw` or sleeping (scenes that only
+        # override `loop` still draw in it, onto a screen nobody sees)
+        self.tick_rate = tick_rate
+        self.max_frame_ticks = max_frame_ticks
+        self.headless = headless
+        self.ticks = 0
+        self.dt = 1 / (tick_rate or framerate or 60)
+        self.alpha = 1.0 # how far between the last tick and the next we're drawing
+        self.accumulator = 0.0
+
+        # `random` gets seeded with this when the game starts (a random seed if it's None), recordings save it
+        self.seed = seed
+        self.recording = None
+        self.replay = None
+        self.policy = None # policy(app) -> the events for this tick, stands in for the keyboard (see run_batch)
+
+        # dirty rect mode only pushes the parts of the screen that changed, falling back to a full flip
+        # once more than `dirty_limit` of the screen changed
+        self.dirty_rects = dirty_rects
+        self.dirty_limit = dirty_limit
+        self.background = None
+        self._draws = [] # (key, rect, surface) for everything drawn this frame
+        self._last_draws = []
+        self._last_keys = set()
+        self._dirty = []
+        self._full_redraw = True
+        self._cleared = False # whether the whole screen got filled this frame
+
         if run_dir:
             if os.path.isdir(run_dir):
                 self.run_dir = run_dir
@@ -40,60 +396,314 @@ class App:
 
         self.asset_dir = os.path.join(self.run_dir, asset_subdir)
 
+        # assets come out of the bundle if there is one (in builds), or from the loose files in `asset_dir` if not
+        bundle_path = os.path.join(self.run_dir, bundle_filename) if bundle_filename else None
+        self.bundle = Bundle(bundle_path) if bundle_path and os.path.isfile(bundle_path) else None
+
         self.image_subdir = image_subdir
         self.sound_subdir = sound_subdir
         self.font_subdir = font_subdir
+        self.map_subdir = map_subdir
+        self.atlas_subdir = atlas_subdir
+
+        # filename -> (surface, converted), sized in bytes
+        self.images = LRUCache(image_cache_size, _surface_bytes)
+
+        # the index pack_atlas.py writes (read on first use), and page filename -> (surface, converted).
+        # Pages count against the image cache's budget, but never get evicted since their images point into them
+        self.atlas = None
+        self.atlas_pages = {}
+
+        # Surface -> {shrink: Mask}, every Sprite using the same image shares its masks
+        self.masks = weakref.WeakKeyDictionary()
+
+        # (filename, size) -> Font and filename -> Sound, so assets that got preloaded aren't loaded twice
+        self.fonts = {}
+        self.sound_files = {}
 
-        self.texts = []
+        # Scene -> Preload, the assets in Scene manifests get loaded on `loader_threads` background threads
+        self.preloads = {}
+        self.loader_threads = loader_threads
+        self.loader = None
+        self.pending_scene = None
+
+        # (content, color, background, font, antialias) -> Text
+        self.texts = LRUCache(text_cache_size)
         self.blits = []
         self.teams = []
 
+        # every input event of the frame, and the actions they map to
+        self.input = Input(self)
+
+        # AUTO_draw draws through this, layer by layer
+        self.render_queue = RenderQueue(self)
+
+        # reusable Bullets, use `bullets.acquire(...)` instead of `Bullet(app, ...)` when firing lots of them
+        self.bullets = Pool(self, Bullet)
+
         # used for string-referencing scenes and sounds that have not been initialized yet
         self.scenes = {}
         self.sounds = {}
 
         self.first_scene = None # YOU NEED TO SET THIS!
+        self.scene = None
+
+        # times every frame, `show_fps` draws its overlay and `profile_export` is where it gets saved when the game quits
+        self.profiler = Profiler(self, profile_frames)
+        self.profile_export = profile_export
 
         self.current_bgm = None
 
+        # background music is streamed instead of decoded up front, sound effects share a pool of mixer channels
+        self.music = MusicPlayer(self)
+        self.voices = VoicePool(self, sound_channels, sound_instances)
+
         self.SCENE_QUIT = SceneQuit(self)
         self.scenes["QUIT"] = self.SCENE_QUIT
 
         self.loop_func = _not_looping
 
+    @contextmanager
+    def startup_step(self, label: str):
+        """Times what's inside into the startup timeline, if the game hasn't shown its first frame yet"""
+        if self.started:
+            yield
+            return
+
+        start = time.perf_counter()
+        yield
+        self.timeline.append((label, start - _IMPORT_START, time.perf_counter() - start))
+
+    def init_font(self):
+        if not pygame.font.get_init():
+            with self.startup_step("font init"):
+                pygame.font.init()
+
+    def init_mixer(self):
+        if not pygame.mixer.get_init():
+            with self.startup_step("mixer init"):
+                pygame.mixer.init()
+
+    @property
+    def font_default(self) -> pygame.font.Font:
+        if not self._font_default:
+            self.init_font()
+            with self.startup_step("default font"):
+                self._font_default = pygame.font.Font(None, 42)
+        return self._font_default
+
+    @font_default.setter
+    def font_default(self, font: pygame.font.Font):
+        self._font_default = font
+
+    @property
+    def font_main(self) -> pygame.font.Font:
+        """The font Texts use if they're not given one, `font_default` until you set it"""
+        return self._font_main or self.font_default
+
+    @font_main.setter
+    def font_main(self, font: pygame.font.Font):
+        self._font_main = font
+
     def get_asset(self, *relative_path):
         return os.path.join(self.asset_dir, *relative_path)
+
+    def open_asset(self, *relative_path):
+        """Something pygame can load the asset from: a file inside the bundle, or the loose file's path"""
+        if self.bundle:
+            name = "/".join(relative_path)
+            if name in self.bundle:
+                return self.bundle.open(name)
+        return self.get_asset(*relative_path)
+
+    def has_asset(self, *relative_path) -> bool:
+        if self.bundle and "/".join(relative_path) in self.bundle:
+            return True
+        return os.path.isfile(self.get_asset(*relative_path))
+
+    def read_asset(self, *relative_path) -> bytes:
+        source = self.open_asset(*relative_path)
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                return file.read()
+        return source.read()
     
     def load_image(self, filename: str) -> pygame.Surface:
-        return pygame.image.load(os.path.join(self.asset_dir, self.image_subdir, filename))
+        """Loads an image through the image cache. The Surface is shared, so `copy()` it before drawing on it!
+        Images packed into the atlas are subsurfaces of their atlas page, the rest get loaded from their own files.
+        Once the display exists, images get converted to its pixel format so blitting them is fast"""
+        entry = self.images.get(filename)
+        display_ready = pygame.display.get_surface() is not None
+
+        if entry is not None and (entry[1] or not display_ready):
+            return entry[0]
+
+        region = self.load_atlas()["images"].get(filename)
+        if region:
+            page, x, y, width, height = region
+            surface = self._load_page(page).subsurface((x, y, width, height)) # the page is converted already
+        else:
+            # either not loaded yet, or loaded before the display existed and has to be converted now
+            with self.startup_step(f"image {filename}"):
+                surface = entry[0] if entry else pygame.image.load(self.open_asset(self.image_subdir, filename), filename)
+                if display_ready:
+                    surface = self._convert(surface)
+
+        self.images.put(filename, (surface, display_ready))
+        return surface
+
+    def load_atlas(self) -> dict:
+        """The atlas index written by pack_atlas.py, or an empty one if the images haven't been packed"""
+        if self.atlas is None:
+            if self.has_asset(self.atlas_subdir, "atlas.json"):
+                self.atlas = json.loads(self.read_asset(self.atlas_subdir, "atlas.json"))
+            else:
+                self.atlas = {"pages": [], "images": {}, "animations": {}}
+        return self.atlas
+
+    def _load_page(self, page: int) -> pygame.Surface:
+        filename = self.atlas["pages"][page]
+        entry = self.atlas_pages.get(filename)
+        display_ready = pygame.display.get_surface() is not None
+
+        if entry is None:
+            with self.startup_step(f"atlas {filename}"):
+                surface = pygame.image.load(self.open_asset(self.atlas_subdir, filename), filename)
+        elif display_ready and not entry[1]:
+            surface = entry[0]
+        else:
+            return entry[0]
+
+        if display_ready:
+            surface = self._convert(surface)
+
+        self.store_page(filename, (surface, display_ready))
+        return surface
+
+    def store_page(self, filename: str, entry: tuple):
+        """Keeps an atlas page, counting it against the image cache's budget"""
+        old = self.atlas_pages.get(filename)
+        if old:
+            self.images.reserve(-_surface_bytes(old))
+        self.atlas_pages[filename] = entry
+        self.images.reserve(_surface_bytes(entry))
+
+    def _convert(self, surface: pygame.Surface) -> pygame.Surface:
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def image_stats(self) -> dict:
+        """Hit/miss counts and the number of bytes held by the image cache"""
+        return self.images.stats()
 
     def load_font(self, filename: str, size: int = 50) -> pygame.font.Font:
-        return pygame.font.Font(os.path.join(self.asset_dir, self.font_subdir, filename), size)
+        font = self.fonts.get((filename, size))
+        if not font:
+            self.init_font()
+            with self.startup_step(f"font {filename} {size}"):
+                font = self.fonts[(filename, size)] = pygame.font.Font(self.open_asset(self.font_subdir, filename), size)
+        return font
     
     def load_sound(self, filename: str, name: str = None, *, vol: float = None) -> pygame.mixer.Sound:
-        sound = pygame.mixer.Sound(os.path.join(self.asset_dir, self.sound_subdir, filename))
+        sound = self.sound_files.get(filename)
+        if not sound:
+            self.init_mixer()
+            with self.startup_step(f"sound {filename}"):
+                sound = self.sound_files[filename] = pygame.mixer.Sound(self.open_asset(self.sound_subdir, filename))
         if name: self.sounds[name] = sound
         if vol: sound.set_volume(vol)
         return sound
 
-    def check_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
+    def preload(self, scene, on_progress = None) -> "Preload":
+        """Starts loading the assets in a Scene's `manifest` in the background, if it isn't already.
+        `on_progress(done, total)` gets called (from the game loop) every time an asset finishes"""
+        scene = self.get_scene(scene)
+
+        preload = self.preloads.get(scene)
+        if not preload:
+            if not self.loader:
+                self.loader = ThreadPoolExecutor(self.loader_threads, thread_name_prefix="engine-loader")
+            preload = self.preloads[scene] = Preload(self, scene.manifest or {})
+
+        if on_progress:
+            preload.on_progress = on_progress
+            on_progress(preload.done, preload.total)
+        return preload
+
+    def poll_preloads(self):
+        """Moves finished background loads into the App, and starts the pending scene once its assets are in.
+        The game loop does this every frame"""
+        for preload in self.preloads.values():
+            if not preload.ready:
+                preload.poll()
+
+        if self.pending_scene:
+            scene, ready = self.pending_scene
+            if self.preloads[scene].ready:
+                self.play_scene(scene, ready)
 
-            elif event.type == pygame.KEYDOWN:
-                if event.key:
-                    return event.key
-
-    def text(self, content: str, color: tuple = None, background: tuple = None, font: pygame.font.Font = None, persist: bool = True):
-        for text in self.texts:
-            if text.content == content and ((not color) or text.color == color) and ((not background) or text.background == background) and ((not font) or text.font == font):
-                return text
-            
-        new_text = Text(self, content, color=color, background=background, font=font)
-        if persist:
-            self.texts.append(new_text)
-        return new_text
+    def check_events(self):
+        """Drains the event queue into `input`, returns the first key pressed this frame (see `input` for the rest)"""
+        if self.replay:
+            pygame.event.pump()
+            events = self.replay.read_events()
+            self.input.process(events)
+        elif self.policy:
+            pygame.event.pump()
+            events = list(self.policy(self))
+            self.input.process(events)
+        else:
+            events = self.input.poll()
+
+        if self.recording:
+            self.recording.add(events)
+
+        if self.input.quit:
+            self.running = False
+        return self.input.key
+
+    def get_pressed(self) -> "KeyState":
+        """Use this instead of `pygame.key.get_pressed()`, it's built from the same events the App saw"""
+        return self.input.state
+
+    def text(self, content: str, color: tuple = None, background: tuple = None, font: pygame.font.Font = None, persist: bool = True, antialias: bool = True):
+        """Returns a cached Text, rendering it only if this exact text hasn't been seen recently. Pass `persist=False` to not cache a new one"""
+        if not color:
+            color = DEFAULT_TEXT_COLOR
+        if not font:
+            font = self.font_main
+
+        key = (content, color, background, font, antialias)
+        text = self.texts.get(key)
+        if text is None:
+            text = Text(self, content, color=color, background=background, font=font, antialias=antialias)
+            if persist:
+                self.texts.put(key, text)
+        return text
+
+    def text_stats(self) -> dict:
+        """Hit/miss counts for the text cache"""
+        return self.texts.stats()
+
+    def get_mask(self, surface: pygame.Surface, shrink: int = 0) -> pygame.Mask:
+        """The collision Mask of `surface`, made once and shared. `shrink` clears that many pixels off every edge"""
+        masks = self.masks.get(surface)
+        if masks is None:
+            masks = self.masks[surface] = {}
+
+        mask = masks.get(shrink)
+        if mask is None:
+            if shrink:
+                width, height = surface.get_size()
+                inner = pygame.Mask((max(width - shrink * 2, 0), max(height - shrink * 2, 0)), fill=True)
+                hitbox = pygame.Mask((width, height))
+                hitbox.draw(inner, (shrink, shrink))
+                mask = self.get_mask(surface).overlap_mask(hitbox, (0, 0))
+            else:
+                mask = pygame.mask.from_surface(surface)
+            masks[shrink] = mask
+        return mask
 
     def get_sound(self, sound):
         if isinstance(sound, pygame.mixer.Sound):
@@ -108,30 +718,168 @@ class App:
         else:
             raise TypeError(f"Argument for `get_sound` must be of type `str` or `pygame.mixer.Sound`, not '{type(sound)}' (you said '{sound}')")
 
-    def play_music(self, sound):
-        sound = self.get_sound(sound)
+    def load_music(self, filename: str, name: str = None, *, vol: float = None):
+        """Registers a music track. Nothing gets decoded until it plays, and then it's streamed"""
+        self.music.load(filename, name, vol=vol)
+
+    def play_music(self, music, *, fade: float = 0.0, loops: int = -1):
+        """Plays a track from `load_music`, crossfading over `fade` seconds. Sounds from `load_sound` still work too,
+        but those are decoded into memory in full"""
+        if isinstance(music, str) and music in self.music.tracks:
+            if isinstance(self.current_bgm, pygame.mixer.Sound):
+                self.current_bgm.stop()
+            self.current_bgm = music
+            self.music.play(music, fade=fade, loops=loops)
+            return
+
+        sound = self.get_sound(music)
         if isinstance(self.current_bgm, pygame.mixer.Sound):
             self.current_bgm.stop()
+        elif self.current_bgm:
+            self.music.stop(fade)
         self.current_bgm = sound
         sound.play(-1)
 
-    def play_scene(self, scene, ready: bool = True):
+    def queue_music(self, name: str):
+        """Gets a track ready to start right as the current one ends (only if that one doesn't loop forever)"""
+        self.music.queue(name)
+
+    def play_sound(self, sound, *, priority: int = 0, max_instances: int = None, vol: float = None) -> pygame.mixer.Channel:
+        """Plays a sound effect through the voice pool, see VoicePool"""
+        return self.voices.play(sound, priority=priority, max_instances=max_instances, vol=vol)
+
+    def get_scene(self, scene) -> "Scene":
         if isinstance(scene, str):
             if scene in self.scenes:
-                scene = self.scenes[scene]
+                return self.scenes[scene]
             else:
                 raise Exception(f"Scene '{scene}' not found in `scenes`")
-        
+
         if isinstance(scene, Scene):
-            if ready:
-                scene.ready()
-                if hasattr(scene, "_ready"):
-                    scene._ready()
+            return scene
+
+        raise TypeError(f"Argument for `play_scene` must be of type `str` or `Scene`, not '{type(scene)}' (you said '{scene}')")
+
+    def play_scene(self, scene, ready: bool = True, *, wait: bool = True, on_progress = None) -> bool:
+        """Switches to a scene. If it has a `manifest`, its assets get loaded first: `wait=True` blocks until they are,
+        `wait=False` keeps the current scene running and switches once they're in (returns False if it didn't switch yet)"""
+        scene = self.get_scene(scene)
+
+        if scene.manifest:
+            preload = self.preload(scene, on_progress)
+            if not preload.ready:
+                if not wait:
+                    self.pending_scene = scene, ready
+                    return False
+                preload.wait()
+
+        self.pending_scene = None
+
+        if ready:
+            scene.ready()
+            if hasattr(scene, "_ready"):
+                scene._ready()
+
+        self.scene = scene
+        self.loop_func = scene.loop
+
+        # the old scene might have drawn things dirty rect mode doesn't know about (like a Menu's widgets)
+        self._full_redraw = True
+
+        return True
+
+    def blit(self, surface: pygame.Surface, pos: tuple) -> pygame.Rect:
+        """Blits to the screen, keeping track of it for dirty rect mode"""
+        rect = self.screen.blit(surface, pos)
+        if self.dirty_rects:
+            self._draws.append(((id(surface), rect.x, rect.y, rect.w, rect.h), rect, surface))
+        return rect
+
+    def blit_many(self, sequence):
+        """Blits a sequence of (surface, pos) pairs in one go, keeping track of them for dirty rect mode"""
+        if not self.dirty_rects:
+            self.screen.blits(sequence, doreturn=False)
+            return
+
+        sequence = list(sequence)
+        for (surface, _), rect in zip(sequence, self.screen.blits(sequence)):
+            self._draws.append(((id(surface), rect.x, rect.y, rect.w, rect.h), rect, surface))
 
-            self.loop_func = scene.loop
+    def fill(self, color, rect: tuple = None):
+        """Fills the screen (or just `rect`) with `color`. Use this instead of `screen.fill` so dirty rect mode works!
+        In dirty rect mode, filling the whole screen with the same color as last frame only restores it under what was drawn last frame"""
+        if not self.dirty_rects:
+            self.screen.fill(color, rect)
+            return
+
+        color = pygame.Color(color)
+
+        if rect:
+            rect = self.screen.fill(color, rect)
+            self._draws.append((("fill", tuple(color), rect.x, rect.y, rect.w, rect.h), rect, None))
+
+        elif color == self.background and not self._full_redraw:
+            for _, old_rect, _ in self._last_draws:
+                self.screen.fill(color, old_rect)
+            self._cleared = True
 
         else:
-            raise TypeError(f"Argument for `play_scene` must be of type `str` or `Scene`, not '{type(scene)}' (you said '{scene}')")
+            self.screen.fill(color)
+            self.background = color
+            self._full_redraw = True
+
+    def mark_dirty(self, rect: tuple = None):
+        """Makes dirty rect mode push `rect` (or the whole screen) this frame, for things drawn without `blit`/`fill`"""
+        if rect:
+            self._dirty.append(pygame.Rect(rect))
+        else:
+            self._full_redraw = True
+
+    def present(self):
+        """Pushes the frame to the display, only updating what changed in dirty rect mode"""
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+
+        keys = {key for key, _, _ in self._draws}
+        draws = self._draws
+        overflow = False
+
+        if self._full_redraw:
+            pygame.display.flip()
+        else:
+            changed = [rect for key, rect, _ in draws if key not in self._last_keys]
+
+            if self._cleared:
+                changed += [rect for key, rect, _ in self._last_draws if key not in keys]
+            else:
+                # nothing got erased (no ticks this frame, or the scene doesn't clear), so last frame's draws are still there,
+                # except where something got drawn over them in the same place
+                retained = {draw[0][-4:]: draw for draw in self._last_draws}
+                for draw in draws:
+                    retained[draw[0][-4:]] = draw
+                draws = list(retained.values())
+                keys = {key for key, _, _ in draws}
+
+                # things moving around a screen that never gets cleared leave a draw behind everywhere they've been
+                if len(draws) > DIRTY_RETAINED_MAX:
+                    draws = self._draws
+                    keys = {key for key, _, _ in draws}
+                    overflow = True
+
+            changed = merge_rects(changed + self._dirty, self.screen.get_rect())
+
+            if sum(rect.w * rect.h for rect in changed) > self.dirty_limit * self.width * self.height:
+                pygame.display.flip()
+            elif changed:
+                pygame.display.update(changed)
+
+        self._last_draws = draws
+        self._last_keys = keys
+        self._draws = []
+        self._dirty = []
+        self._full_redraw = overflow # the old draws are forgotten, so the next fill has to clear everything
+        self._cleared = False
 
     def ready(self):
         """Override this function with your game's init stuff"""
@@ -140,50 +888,968 @@ class App:
     def opt_quit(self, key):
         self.running = False
 
-    def run(self):
-        """This starts the game, DO NOT override this function!"""
-        pygame.init()
-        pygame.mixer.init()
+    def run(self, ticks: int = None, *, record: str = None, replay: str = None, hashes: bool = False, verify: bool = True):
+        """This starts the game, DO NOT override this function! Pass `ticks` to stop after that many simulation ticks.
+        `record` saves the seed and every tick's input to a file (with a state hash per tick if `hashes`), and `replay` plays
+        one of those files back headlessly as fast as possible, raising if the state hashes stop matching (unless not `verify`)"""
+        if replay:
+            self.replay = Replay(replay, verify)
+            self.seed = self.replay.seed
+            self.headless = True
+        elif self.seed is None:
+            self.seed = int.from_bytes(os.urandom(4), "little")
+
+        random.seed(self.seed)
+
+        if record:
+            self.recording = Recording(record, self.seed, hashes)
+
+        if self.headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+        with self.startup_step("pygame init"):
+            if self.lazy_init:
+                pygame.display.init()
+            else:
+                pygame.init()
+                pygame.mixer.init()
 
-        # init default assets
-        self.font_main = self.font_default = pygame.font.Font(None, 42)
+        if not self.lazy_init:
+            # init default assets
+            self.font_default
 
         if self.logo_filename:
             self.logo = self.load_image(self.logo_filename)
             pygame.display.set_icon(self.logo)
             pygame.display.set_caption(self.title)
-     
+
+        if self.lazy_init:
+            self.open_window()
+            with self.startup_step("first flip"):
+                self.draw_loading()
+                pygame.display.flip()
+
         # oh lol!
-        self.ready()
+        with self.startup_step("ready"):
+            self.ready()
+
+        if not self.lazy_init:
+            self.open_window()
 
-        self.screen = pygame.display.set_mode(self.size)
         self.clock = pygame.time.Clock()
+        self.input.restrict()
 
         self.running = True
 
-        self.play_scene(self.first_scene)
+        with self.startup_step("first scene"):
+            self.play_scene(self.first_scene)
 
-        # GAME LOOP
-        while self.running:
-            key = self.check_events()
+        self._last_frame = time.perf_counter()
 
-            self.loop_func(key)
+        # GAME LOOP
+        try:
+            while self.running:
+                self.frame()
+
+                if not self.started:
+                    self.started = True
+                    self.timeline.append(("first frame", time.perf_counter() - _IMPORT_START, 0.0))
+                    if self.startup_report:
+                        self.print_startup()
+
+                if ticks is not None and self.ticks >= ticks:
+                    self.running = False
+                if self.replay and self.replay.done:
+                    self.running = False
+        finally:
+            if self.recording:
+                self.recording.close()
+
+        if self.profile_export:
+            self.profiler.export(self.profile_export)
+
+    def open_window(self):
+        with self.startup_step("set_mode"):
+            self.screen = pygame.display.set_mode(self.size)
+
+    def draw_loading(self):
+        """Draws the frame that's shown while `ready` runs with `lazy_init`. Override this for a loading screen"""
+        self.screen.fill((0, 0, 0))
+
+    def print_startup(self):
+        """Prints the startup timeline, with the slowest steps marked"""
+        total = self.timeline[-1][1]
+        print(f"startup: {total * 1000:.1f} ms to the first frame")
+        for label, start, duration in sorted(self.timeline, key=lambda step: step[1]):
+            mark = " <--" if duration > total * 0.1 else ""
+            print(f"{start * 1000:9.1f} ms {duration * 1000:9.1f} ms  {label}{mark}")
+
+    def frame(self):
+        """Runs one frame of the game loop: events, then as many ticks as are due, then drawing"""
+        profiler = self.profiler
+        profiler.begin_frame()
+
+        start = time.perf_counter()
+        key = self.check_events()
+        if self.preloads:
+            self.poll_preloads()
+        if self.music.fading:
+            self.music.update()
+        now = time.perf_counter()
+        profiler.add("events", now - start)
+
+        start = now
+        if self.headless:
+            # fast-forward: exactly one tick per frame, no `draw`, overlay or present and no waiting
+            self.dt = 1 / (self.tick_rate or self.framerate or 60)
+            self.tick(key)
+
+        elif not self.tick_rate:
+            self.dt = now - self._last_frame
+            self.tick(key, self.loop_func)
 
+        else:
+            # fixed timestep: catch the simulation up with the real time that passed, but never more than
+            # `max_frame_ticks` at once, otherwise a slow frame makes the next one even slower
+            self.dt = 1 / self.tick_rate
+            self.accumulator += min(now - self._last_frame, self.dt * self.max_frame_ticks)
+
+            done = 0
+            while self.accumulator >= self.dt and done < self.max_frame_ticks:
+                self.tick(key if not done else None)
+                self.accumulator -= self.dt
+                done += 1
+
+            if self.accumulator >= self.dt:
+                self.accumulator %= self.dt
+
+            self.alpha = self.accumulator / self.dt
+            if self.scene:
+                self.scene.draw(self.alpha)
+            self.alpha = 1.0
+
+        self._last_frame = now
+        now = time.perf_counter()
+        profiler.add("loop", now - start)
+
+        if not self.headless:
             if self.show_fps:
-                fps = int(self.clock.get_fps())
-                color = tuple([random.randint(0, 255) for _ in range(3)])
-                fps_text = self.font_main.render(str(fps), True, color, (0, 0, 0))
-                self.screen.blit(fps_text, (5, 5))
+                start = now
+                profiler.draw()
+                now = time.perf_counter()
+                profiler.add("overlay", now - start)
 
+            start = now
             self.clock.tick(self.framerate)
-            pygame.display.flip()
+            now = time.perf_counter()
+            profiler.add("tick", now - start)
+
+            start = now
+            self.present()
+            profiler.add("present", time.perf_counter() - start)
+
+        profiler.end_frame()
+
+    def tick(self, key: int = None, func = None):
+        """Runs one simulation tick of the current scene (or `func`)"""
+        if self.recording:
+            self.recording.write_events()
+
+        if func:
+            func(key)
+        elif self.scene:
+            self.scene.tick(key)
+        else:
+            self.loop_func(key)
+        self.ticks += 1
+        self.input.consume() # presses only count for the first tick after them
+
+        if self.camera:
+            self.camera.update()
+
+        if self.recording and self.recording.hashes:
+            self.recording.write_hash(self.state_hash())
+        elif self.replay and self.replay.hashes:
+            self.replay.check_hash(self.ticks, self.state_hash())
+
+    def state_hash(self) -> int:
+        """CRC32 of the tick count and where everything in the current scene is, recordings use it to catch desyncs.
+        Override it to hash more of your game's state"""
+        crc = zlib.crc32(struct.pack("<q", self.ticks))
+        for item in getattr(self.scene, "blits", None) or ():
+            if isinstance(item, ProjectileSwarm):
+                for values in (item.x, item.y, item.alive):
+                    crc = zlib.crc32(values[:item.count].tobytes(), crc)
+            elif isinstance(item, Positional):
+                crc = zlib.crc32(struct.pack("<dd", item.x, item.y), crc)
+        return crc
+
+
+def merge_rects(rects: list, bounds: pygame.Rect = None) -> list:
+    """Unions overlapping rects together (and clips them to `bounds`), so nothing gets updated twice"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if bounds:
+            rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+
+        merged.append(rect)
+    return merged
+
+
+class Preload:
+    """Loads the assets in a Scene's `manifest` on the App's loader threads. Only decoding happens on the threads,
+    `poll` (which the game loop calls) moves the finished assets into the App's caches"""
+    def __init__(self, app: App, manifest: dict):
+        self.app = app
+        self.on_progress = None
+        self.jobs = []
+
+        # the threads can't start these themselves
+        if manifest.get("sounds"):
+            app.init_mixer()
+        if manifest.get("fonts"):
+            app.init_font()
+
+        # images in the atlas are loaded as the pages they're on, each page only once
+        atlas = app.load_atlas()
+        pages = set()
+        for filename in manifest.get("images", ()):
+            region = atlas["images"].get(filename)
+            if region:
+                pages.add(atlas["pages"][region[0]])
+            else:
+                self._submit("image", (filename,), pygame.image.load, app.open_asset(app.image_subdir, filename), filename)
+
+        for filename in sorted(pages - set(app.atlas_pages)):
+            self._submit("page", (filename,), pygame.image.load, app.open_asset(app.atlas_subdir, filename), filename)
+
+        for entry in manifest.get("sounds", ()):
+            # "file.mp3" or ("file.mp3", name) or ("file.mp3", name, volume)
+            entry = (entry,) if isinstance(entry, str) else tuple(entry)
+            self._submit("sound", entry, pygame.mixer.Sound, app.open_asset(app.sound_subdir, entry[0]))
+
+        for entry in manifest.get("music", ()):
+            # like sounds, but music is streamed when it plays so there's nothing to load
+            entry = (entry,) if isinstance(entry, str) else tuple(entry)
+            app.load_music(*entry[:2], vol=entry[2] if len(entry) > 2 else None)
+
+        for entry in manifest.get("fonts", ()):
+            # "file.ttf" or ("file.ttf", size)
+            filename, size = (entry, 50) if isinstance(entry, str) else entry
+            self._submit("font", (filename, size), pygame.font.Font, app.open_asset(app.font_subdir, filename), size)
+
+        self.total = len(self.jobs)
+        self.done = 0
+
+    def _submit(self, kind: str, entry: tuple, func, *args):
+        self.jobs.append((kind, entry, self.app.loader.submit(func, *args)))
+
+    @property
+    def ready(self) -> bool:
+        return self.done == self.total
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def poll(self):
+        """Installs every asset that finished loading. Errors from the loader threads get raised here"""
+        remaining = []
+        for job in self.jobs:
+            if job[2].done():
+                self._install(*job)
+            else:
+                remaining.append(job)
+
+        if len(remaining) != len(self.jobs):
+            self.jobs = remaining
+            self.done = self.total - len(remaining)
+            if self.on_progress:
+                self.on_progress(self.done, self.total)
+
+    def wait(self):
+        """Blocks until everything is loaded"""
+        for _, _, future in self.jobs:
+            future.result()
+        self.poll()
+
+    def _install(self, kind: str, entry: tuple, future):
+        asset = future.result()
+        app = self.app
+
+        if kind == "image":
+            if entry[0] not in app.images:
+                app.images.put(entry[0], (asset, False)) # gets converted the first time it's used
+        elif kind == "page":
+            if entry[0] not in app.atlas_pages:
+                app.store_page(entry[0], (asset, False))
+        elif kind == "sound":
+            app.sound_files.setdefault(entry[0], asset)
+            app.load_sound(*entry[:2], vol=entry[2] if len(entry) > 2 else None)
+        else:
+            app.fonts.setdefault(entry, asset)
+
+
+class KeyState:
+    """Held keys, indexable like `pygame.key.get_pressed()`"""
+    def __init__(self, held: set):
+        self.held = held
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.held
+
+
+class Input:
+    """Drains the event queue once per frame into a buffer, and maps keys to named actions with `bind`.
+    Scenes can read every key and action since the last tick from here, not just the first key passed to `loop`.
+    The buffer only gets cleared once a tick ran, so with a `tick_rate` presses in frames without a tick aren't lost"""
+    def __init__(self, app: App):
+        self.app = app
+
+        # SDL drops every other event type before it reaches the queue, add to this before `run` if you need more
+        self.allowed = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.WINDOWFOCUSLOST]
+
+        self.bindings = {} # key -> tuple of actions
+
+        self.events = [] # events since the last tick
+        self.keys = [] # keys pressed since the last tick, in order
+        self.pressed = set() # actions pressed since the last tick
+        self.held_keys = set()
+        self.state = KeyState(self.held_keys)
+        self.quit = False
+
+        self.bind("up", pygame.K_UP)
+        self.bind("down", pygame.K_DOWN)
+        self.bind("left", pygame.K_LEFT)
+        self.bind("right", pygame.K_RIGHT)
+
+    def restrict(self):
+        """Tells SDL to only queue the `allowed` event types (the App does this once the window exists)"""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.allowed)
+
+    def bind(self, action: str, *keys: int):
+        for key in keys:
+            if action not in self.bindings.get(key, ()):
+                self.bindings[key] = self.bindings.get(key, ()) + (action,)
+
+    def unbind(self, action: str):
+        for key, actions in list(self.bindings.items()):
+            if action in actions:
+                actions = tuple(a for a in actions if a != action)
+                if actions:
+                    self.bindings[key] = actions
+                else:
+                    del self.bindings[key]
+
+    def poll(self) -> list:
+        events = pygame.event.get()
+        self.process(events)
+        return events
+
+    def process(self, events: list):
+        """Adds `events` to the buffer"""
+        self.events += events
+        self.quit = False
+
+        bindings = self.bindings
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key:
+                    self.keys.append(event.key)
+                    self.held_keys.add(event.key)
+                    if event.key in bindings:
+                        self.pressed.update(bindings[event.key])
+
+            elif event.type == pygame.KEYUP:
+                self.held_keys.discard(event.key)
+
+            elif event.type == pygame.QUIT:
+                self.quit = True
+
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                self.held_keys.clear()
+
+    def consume(self):
+        """Forgets the buffered presses once a tick saw them, so later ticks don't see them again"""
+        self.events = []
+        self.keys = []
+        self.pressed = set()
+
+    @property
+    def key(self) -> int:
+        """The first key pressed since the last tick"""
+        return self.keys[0] if self.keys else None
+
+    @property
+    def held(self) -> set:
+        """Actions with one of their keys held down"""
+        held = set()
+        for key in self.held_keys:
+            if key in self.bindings:
+                held.update(self.bindings[key])
+        return held
+
+    def is_held(self, action: str) -> bool:
+        return any(action in self.bindings[key] for key in self.held_keys if key in self.bindings)
+
+
+class MusicPlayer:
+    """Streams background music through `pygame.mixer.music`, so a track never sits in memory decoded.
+    The mixer only streams one track at a time, so a crossfade fades the old track out and then the new one in"""
+    def __init__(self, app: App):
+        self.app = app
+        self.tracks = {} # name -> (filename, volume)
+        self.current = None
+        self.queued = None
+
+        # the track waiting for the current one to fade out: (name, loops, fade), and when the fade started
+        self.next = None
+        self.fade_start = 0.0
+
+    @property
+    def fading(self) -> bool:
+        return self.next is not None
+
+    def load(self, filename: str, name: str = None, *, vol: float = None):
+        self.tracks[name or filename] = (filename, 1.0 if vol is None else vol)
+
+    def _open(self, name: str):
+        if name not in self.tracks:
+            raise Exception(f"Music '{name}' not found in `tracks`, use `load_music` first")
+        filename, _ = self.tracks[name]
+        return self.app.open_asset(self.app.sound_subdir, filename), filename
+
+    def play(self, name: str, *, fade: float = 0.0, loops: int = -1):
+        if name == self.current and not self.next and pygame.mixer.music.get_busy():
+            return
+
+        if fade and self.current and pygame.mixer.music.get_busy():
+            self.next = name, loops, fade
+            self.fade_start = time.perf_counter()
+        else:
+            self._start(name, loops, fade)
+
+    def _start(self, name: str, loops: int, fade_in: float):
+        self.app.init_mixer()
+        source, filename = self._open(name)
+
+        with self.app.startup_step(f"music {filename}"):
+            pygame.mixer.music.load(source, filename)
+        pygame.mixer.music.set_volume(self.tracks[name][1])
+        pygame.mixer.music.play(loops, fade_ms=int(fade_in * 1000))
+
+        self.current = name
+        self.queued = None
+        self.next = None
+
+    def update(self):
+        """Moves the crossfade along, the App calls this every frame while there is one"""
+        name, loops, fade = self.next
+        progress = (time.perf_counter() - self.fade_start) / (fade / 2)
+
+        if progress >= 1 or not pygame.mixer.music.get_busy():
+            self._start(name, loops, fade / 2)
+        else:
+            pygame.mixer.music.set_volume(self.tracks[self.current][1] * (1 - progress))
+
+    def queue(self, name: str):
+        source, filename = self._open(name)
+        pygame.mixer.music.queue(source, filename)
+        self.queued = name
+
+    def stop(self, fade: float = 0.0):
+        self.next = None
+        self.current = None
+        if not pygame.mixer.get_init():
+            return
+        if fade:
+            pygame.mixer.music.fadeout(int(fade * 1000))
+        else:
+            pygame.mixer.music.stop()
+
+
+class VoicePool:
+    """Plays sound effects on `channels` reserved mixer channels. A sound only gets `max_instances` voices at once,
+    and when every channel is busy the lowest priority voice (the oldest one out of those) is cut off for the new sound.
+    Sounds that lose out to higher priority ones are dropped"""
+    def __init__(self, app: App, channels: int = 16, max_instances: int = 4):
+        self.app = app
+        self.size = channels
+        self.max_instances = max_instances
+        self.channels = []
+        self.voices = [] # (sound, priority, age) per channel, None if the pool didn't start what's playing there
+        self.age = 0
+
+    def _open(self):
+        self.app.init_mixer()
+        # the pool gets the first channels to itself, anything played with `Sound.play` uses the ones after those
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.size + 8))
+        pygame.mixer.set_reserved(self.size)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.size)]
+        self.voices = [None] * self.size
+
+    def play(self, sound, *, priority: int = 0, max_instances: int = None, vol: float = None) -> pygame.mixer.Channel:
+        """Returns the channel the sound plays on, or None if it got dropped"""
+        sound = self.app.get_sound(sound)
+        if not self.channels:
+            self._open()
+
+        busy = [channel.get_busy() for channel in self.channels]
+        same = [i for i, voice in enumerate(self.voices) if busy[i] and voice is not None and voice[0] is sound]
+
+        if len(same) >= (max_instances or self.max_instances):
+            candidates = same
+        elif not all(busy):
+            candidates = [busy.index(False)]
+        else:
+            candidates = range(len(self.channels))
+
+        # lowest priority first, then the oldest. Channels busy with something the pool didn't play (another App in
+        # the same process, or code using the Channel directly) count as the lowest priority there is
+        unknown = (None, float("-inf"), 0)
+        index = min(candidates, key=lambda i: (self.voices[i] or unknown)[1:] if busy[i] else (float("-inf"), 0))
+        if busy[index] and (self.voices[index] or unknown)[1] > priority:
+            return None
+
+        channel = self.channels[index]
+        channel.play(sound)
+        channel.set_volume(1.0 if vol is None else vol)
+
+        self.age += 1
+        self.voices[index] = sound, priority, self.age
+        return channel
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+
+RECORDING_MAGIC = b"ENGREC1"
+RECORDING_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT, pygame.WINDOWFOCUSLOST) # index in here is what gets saved
+
+
+class Recording:
+    """Writes the seed and every tick's input events (plus optionally a state hash) to a compact binary file.
+    Header is the magic, the seed (u64) and a flags byte. Each tick is an event count (u16), then a type (u8)
+    and key (i32) per event, then the state hash (u32) if the recording has hashes"""
+    def __init__(self, path: str, seed: int, hashes: bool = False):
+        self.file = open(path, "wb")
+        self.hashes = hashes
+        self.file.write(RECORDING_MAGIC + struct.pack("<QB", seed, int(hashes)))
+
+        # everything since the last tick, frames that run no tick still change what the next one sees
+        self.pending = []
+
+    def add(self, events: list):
+        self.pending += [event for event in events if event.type in RECORDING_EVENTS]
+
+    def write_events(self):
+        events, self.pending = self.pending, []
+        data = struct.pack("<H", len(events))
+        for event in events:
+            data += struct.pack("<Bi", RECORDING_EVENTS.index(event.type), getattr(event, "key", 0))
+        self.file.write(data)
+
+    def write_hash(self, value: int):
+        self.file.write(struct.pack("<I", value))
+
+    def close(self):
+        self.file.close()
+
+
+class Replay:
+    """Reads a Recording back one tick at a time"""
+    def __init__(self, path: str, verify: bool = True):
+        with open(path, "rb") as file:
+            self.data = file.read()
+
+        if not self.data.startswith(RECORDING_MAGIC):
+            raise Exception(f"'{path}' is not a recording")
+
+        self.seed, flags = struct.unpack_from("<QB", self.data, len(RECORDING_MAGIC))
+        self.hashes = bool(flags & 1)
+        self.verify = verify
+        self.offset = len(RECORDING_MAGIC) + 9
+
+    @property
+    def done(self) -> bool:
+        return self.offset >= len(self.data)
+
+    def read_events(self) -> list:
+        if self.done:
+            return []
+
+        count, = struct.unpack_from("<H", self.data, self.offset)
+        self.offset += 2
+
+        events = []
+        for _ in range(count):
+            kind, key = struct.unpack_from("<Bi", self.data, self.offset)
+            self.offset += 5
+            events.append(pygame.event.Event(RECORDING_EVENTS[kind], key=key))
+        return events
+
+    def check_hash(self, tick: int, value: int):
+        expected = self.read_hash()
+        if self.verify and expected != value:
+            raise Exception(f"Replay desynced at tick {tick}: state hash is {value:08x}, the recording has {expected:08x}")
+
+    def read_hash(self) -> int:
+        value, = struct.unpack_from("<I", self.data, self.offset)
+        self.offset += 4
+        return value
+
+
+BUNDLE_MAGIC = b"ENGPAK1"
+BUNDLE_HEADER = "<IQ" # entry count, index offset
+BUNDLE_ENTRY = "<QQQ" # offset, stored size, original size (they differ if the entry is zlib compressed)
+
+
+class BundleFile(io.RawIOBase):
+    """Read-only file over part of a memory map, so pygame can load straight out of a Bundle without copying it"""
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.view[self.position:self.position + len(buffer)]
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, min(offset, len(self.view)))
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+
+class Bundle:
+    """Every asset in one file, made with pack_bundle.py. The file gets memory mapped, nothing is extracted.
+    Header is the magic, the entry count and the index offset. The index has, per entry, the name length (u16),
+    the name (like "images/cat.png") and then the offset, stored size and original size (u64 each)"""
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.map[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            raise Exception(f"'{path}' is not an asset bundle")
+
+        count, offset = struct.unpack_from(BUNDLE_HEADER, self.map, len(BUNDLE_MAGIC))
+        self.entries = {}
+        for _ in range(count):
+            length, = struct.unpack_from("<H", self.map, offset)
+            name = self.map[offset + 2:offset + 2 + length].decode()
+            offset += 2 + length
+            self.entries[name] = struct.unpack_from(BUNDLE_ENTRY, self.map, offset)
+            offset += struct.calcsize(BUNDLE_ENTRY)
+
+        self.view = memoryview(self.map)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def open(self, name: str) -> io.RawIOBase:
+        offset, size, original_size = self.entries[name]
+        if size != original_size:
+            return io.BytesIO(zlib.decompress(self.view[offset:offset + size]))
+        return BundleFile(self.view[offset:offset + size])
+
+    def read(self, name: str) -> bytes:
+        return self.open(name).read()
+
+
+class InputScript:
+    """A policy that presses keys on fixed ticks. `steps` are (tick, key, hold): `key` goes down on `tick` and
+    comes back up `hold` ticks later. Keys can be pygame constants or their names, like "K_z" """
+    def __init__(self, steps: list):
+        self.events = {}
+        for tick, key, *hold in steps:
+            if isinstance(key, str):
+                key = getattr(pygame, key)
+            self.events.setdefault(tick, []).append((pygame.KEYDOWN, key))
+            self.events.setdefault(tick + (hold[0] if hold else 1), []).append((pygame.KEYUP, key))
+
+    @classmethod
+    def load(cls, path: str) -> "InputScript":
+        """Reads the steps from a JSON file, a list of [tick, key, hold]"""
+        with open(path) as file:
+            return cls(json.load(file))
+
+    def __call__(self, app: App) -> list:
+        return [pygame.event.Event(kind, key=key) for kind, key in self.events.get(app.ticks, ())]
+
+
+def _resolve(target):
+    """"module:name" -> the object, anything else is used as is. Strings keep targets picklable across processes"""
+    if not isinstance(target, str):
+        return target
+
+    module_name, _, name = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, name) if name else module
+
+
+def _batch_app(target) -> App:
+    """A fresh App from `target`: an App class or factory function, or "module:name" of one (or of an App instance,
+    in which case the module gets reloaded for every run, since games build their App and scenes when imported)"""
+    if isinstance(target, str):
+        module_name = target.partition(":")[0]
+        if module_name in sys.modules:
+            importlib.reload(sys.modules[module_name])
+
+    app = _resolve(target)
+    if not isinstance(app, App):
+        app = app()
+    return app
+
+
+def _batch_init():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def _batch_run(index: int, target, job: dict, ticks: int, policy, metrics) -> dict:
+    """Runs one App for `run_batch` on a worker process"""
+    result = {"job": index, "seed": job.get("seed")}
+    start = time.perf_counter()
+    try:
+        app = _batch_app(target)
+        app.headless = True
+        app.seed = job.get("seed")
+
+        policy = job.get("policy", policy)
+        if job.get("script") is not None:
+            script = job["script"]
+            policy = InputScript.load(script) if isinstance(script, str) else InputScript(script)
+        app.policy = _resolve(policy)
+
+        app.run(ticks=job.get("ticks", ticks))
+
+        wall = time.perf_counter() - start
+        result.update({
+            "seed": app.seed,
+            "ticks": app.ticks,
+            "wall_s": wall,
+            "ticks_per_s": app.ticks / wall if wall else 0.0,
+            "scene": getattr(app.scene, "name", None),
+            "state_hash": app.state_hash(),
+            "frame_ms": app.profiler.percentiles(),
+        })
+        if metrics:
+            result["metrics"] = _resolve(metrics)(app)
+    except Exception:
+        result["error"] = traceback.format_exc()
+        result["wall_s"] = time.perf_counter() - start
+    finally:
+        # workers get reused, so the next run has to start from a clean pygame (no stale mixer channels or display)
+        pygame.quit()
+    return result
+
+
+def run_batch(target, jobs: list, *, ticks: int = 3600, workers: int = None, policy = None, metrics = None):
+    """Runs lots of headless Apps on a pool of worker processes, one per core by default, and yields a result dict
+    for every run as soon as it finishes (not in order, `job` is the index in `jobs`).
+    `target` makes the App (see `_batch_app`). `jobs` are seeds or dicts with "seed" and optionally "ticks",
+    "script" (InputScript steps or a JSON file of them) or "policy". A `policy(app)` returns each tick's input events,
+    and `metrics(app)` returns what to report once the run is over. Pass them as "module:name" if they can't be pickled.
+    Runs that raise come back with an "error" traceback instead of stopping the batch"""
+    jobs = [job if isinstance(job, dict) else {"seed": job} for job in jobs]
+
+    # spawned workers don't inherit the parent's pygame state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_batch_init) as pool:
+        futures = [pool.submit(_batch_run, i, target, job, ticks, policy, metrics) for i, job in enumerate(jobs)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class SpatialHash:
+    """Uniform grid that buckets rectangles by the cells they overlap, so lookups only touch nearby items"""
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.items = {}  # item -> tuple of cells it was inserted into
+
+    def _cells(self, x, y, w, h):
+        size = self.cell_size
+        x0, y0 = int(x // size), int(y // size)
+        x1, y1 = int((x + w) // size), int((y + h) // size)
+        return tuple((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def insert(self, item, rect: tuple = None):
+        """Adds `item` to the grid, using `rect` or the item's own x, y, width and height"""
+        if item in self.items:
+            self.remove(item)
+
+        if not rect:
+            rect = item.x, item.y, item.width, item.height
+
+        cells = self._cells(*rect)
+        for cell in cells:
+            if cell in self.cells:
+                self.cells[cell].append(item)
+            else:
+                self.cells[cell] = [item]
+        self.items[item] = cells
+
+    def remove(self, item):
+        cells = self.items.pop(item, None)
+        if cells is None:
+            return False
+
+        for cell in cells:
+            bucket = self.cells[cell]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[cell]
+        return True
+
+    def update(self, item, rect: tuple = None):
+        """Call this after moving an item that is in the grid"""
+        self.insert(item, rect)
+
+    def query(self, x, y, w, h) -> list:
+        """Returns every item in the cells overlapping the given rect (it might not actually overlap!), in a stable order"""
+        found = {}
+        cells = self.cells
+        for cell in self._cells(x, y, w, h):
+            if cell in cells:
+                for item in cells[cell]:
+                    found[item] = None
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.items.clear()
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Camera:
+    """Looks at part of a world that's bigger than the window. Set `app.camera` to one and Positionals get drawn relative
+    to it, with the ones it can't see skipped. Use `query` on a SpatialHash to only even look at what's visible"""
+    def __init__(self, app: App, *, pos: tuple = (0, 0), bounds: tuple = None, smoothing: float = 0.0):
+        self.app = app
+        self.x, self.y = pos
+        self.prev_x, self.prev_y = pos
+        self.width, self.height = app.size
+
+        # the camera never shows anything outside of this (x, y, width, height), set it to None to let it go anywhere
+        self.bounds = bounds or (0, 0, app.world_width, app.world_height)
+
+        self.target = None
+        self.smoothing = smoothing # 0 snaps to the target, closer to 1 follows it more lazily
+
+        self.clamp()
+
+    def follow(self, target: "Positional", smoothing: float = None):
+        """Keeps `target` in the middle of the screen (the App updates the camera after every tick)"""
+        self.target = target
+        if smoothing is not None:
+            self.smoothing = smoothing
+
+    def look_at(self, x: float, y: float):
+        """Centers the camera on a world position right away"""
+        self.x = self.prev_x = x - self.width / 2
+        self.y = self.prev_y = y - self.height / 2
+        self.clamp()
+        self.prev_x, self.prev_y = self.x, self.y
+
+    def update(self):
+        self.prev_x, self.prev_y = self.x, self.y
+
+        if self.target:
+            target = self.target
+            goal_x = target.x + getattr(target, "width", 0) / 2 - self.width / 2
+            goal_y = target.y + getattr(target, "height", 0) / 2 - self.height / 2
+
+            self.x += (goal_x - self.x) * (1 - self.smoothing)
+            self.y += (goal_y - self.y) * (1 - self.smoothing)
+
+        self.clamp()
+
+    def clamp(self):
+        if not self.bounds:
+            return
+
+        left, top, width, height = self.bounds
+        self.x = max(left, min(self.x, left + width - self.width))
+        self.y = max(top, min(self.y, top + height - self.height))
+
+    def offset(self) -> tuple:
+        """The camera's position for drawing right now, in between ticks like Positionals"""
+        alpha = self.app.alpha
+        if alpha < 1:
+            return self.prev_x + (self.x - self.prev_x) * alpha, self.prev_y + (self.y - self.prev_y) * alpha
+        return self.x, self.y
+
+    def view(self) -> pygame.Rect:
+        """The part of the world that's on screen"""
+        return pygame.Rect(int(self.x), int(self.y), self.width, self.height)
+
+    def to_screen(self, x: float, y: float) -> tuple:
+        return x - self.x, y - self.y
+
+    def to_world(self, x: float, y: float) -> tuple:
+        return x + self.x, y + self.y
+
+    def can_see(self, x: float, y: float, width: float, height: float) -> bool:
+        return x < self.x + self.width and y < self.y + self.height and x + width > self.x and y + height > self.y
+
+    def query(self, grid: SpatialHash) -> list:
+        """Everything in `grid` that's on screen, looking only at the grid cells the camera overlaps"""
+        # one cell of margin, so things moving in between ticks don't pop in late
+        margin = grid.cell_size
+        return [
+            item for item in grid.query(self.x - margin, self.y - margin, self.width + margin * 2, self.height + margin * 2)
+            if self.can_see(item.x - margin, item.y - margin, item.width + margin * 2, item.height + margin * 2)
+        ]
 
 
 class Team:
-    def __init__(self, app: App, name: str, members: list):
+    """Teams are collision groups: Sprites in a Team are blocked by the Obstacles and the solid TileMap tiles in it.
+    Pass `cell_size` to index the Obstacles in a SpatialHash"""
+    def __init__(self, app: App, name: str, members: list, *, cell_size: int = None):
         self.app = app
         self.name = name
         self.members = members
+        self.member_set = set()
+        self.obstacles = []
+        self.tilemaps = []
+
+        if cell_size:
+            self.grid = SpatialHash(cell_size)
+        else:
+            self.grid = None
+
+        for member in members:
+            self._track(member)
 
         self.enable()
 
@@ -199,20 +1865,67 @@ class Team:
             return True
         return False
 
+    def _track(self, member):
+        self.member_set.add(member)
+
+        if isinstance(member, Obstacle):
+            member.teams.append(self)
+            if member.enabled:
+                self.index(member)
+        elif isinstance(member, TileMap):
+            self.tilemaps.append(member)
+
     def add_member(self, member):
         self.members.append(member)
+        self._track(member)
 
     def add_members(self, members: list):
         for member in members:
             self.add_member(member)
 
+    def remove_member(self, member):
+        if member in self.member_set:
+            self.members.remove(member)
+            self.member_set.discard(member)
+
+            if isinstance(member, Obstacle):
+                self.unindex(member)
+                member.teams.remove(self)
+            elif isinstance(member, TileMap):
+                self.tilemaps.remove(member)
+            return True
+        return False
+
+    def index(self, obstacle: "Obstacle"):
+        """Makes the Obstacle solid for this Team (call again if the Obstacle moved)"""
+        if self.grid is not None:
+            self.grid.insert(obstacle)
+        elif obstacle not in self.obstacles:
+            self.obstacles.append(obstacle)
+
+    def unindex(self, obstacle: "Obstacle"):
+        if self.grid is not None:
+            self.grid.remove(obstacle)
+        elif obstacle in self.obstacles:
+            self.obstacles.remove(obstacle)
+
+    def get_obstacles(self, x, y, w, h):
+        """Returns the Obstacles that could overlap the given rect"""
+        if self.grid is not None:
+            return self.grid.query(x, y, w, h)
+        return self.obstacles
+
 
 class Scene:
     """Subclass this to make a scene. Override `ready` and `loop`."""
+    # assets to load in the background before the scene starts, like {"images": ["cat.png"], "sounds": [("bonk.mp3", "bonk")], "music": [("cats.mp3", "cats")], "fonts": [("alagard.ttf", 50)]}
+    manifest = None
+
     def __init__(self, app: App, name: str = None):
         self.app = app
 
         # this stores the object inside the App's scene list, allowing it to be accessed as a string, meaning no errors unless you code it wrong!
+        self.name = name
         if name: self.app.scenes[name] = self
 
         self.blits = []
@@ -227,6 +1940,627 @@ class Scene:
         """Override this function with your Scene's loop, including argument `key` of type `int`"""
         pass
 
+    def tick(self, key: int):
+        """When the App has a `tick_rate`, this runs that many times per second. Override it with just your game logic
+        (and `draw` with your rendering) to get smooth interpolated drawing, otherwise it runs `loop`"""
+        self.loop(key)
+
+    def draw(self, alpha: float):
+        """When the App has a `tick_rate`, this runs once per frame after the ticks. `alpha` (0-1) is how far we are
+        between the last tick and the next, Positionals use it to draw in between"""
+        pass
+
+    def snapshot(self, snapshot: "SceneSnapshot" = None) -> "SceneSnapshot":
+        """Captures where everything in `blits` is (plus the tick and the random state). Pass an old snapshot to reuse its buffers"""
+        snapshot = snapshot or SceneSnapshot()
+        snapshot.capture(self)
+        return snapshot
+
+    def restore(self, snapshot: "SceneSnapshot"):
+        """Puts everything back the way it was when `snapshot` was taken"""
+        snapshot.restore(self)
+
+    def save_snapshot(self) -> bytes:
+        """A snapshot as bytes, for quick-saves"""
+        return self.snapshot().to_bytes()
+
+    def load_snapshot(self, data: bytes):
+        """Restores a snapshot from `save_snapshot`. The entities that aren't Bullets have to exist already (like the
+        ones `ready` makes), they're matched up by type and image. Bullets come from the App's Pool"""
+        SceneSnapshot.from_bytes(self, data)
+
+
+SNAPSHOT_MAGIC = b"ENGSNAP1"
+SNAPSHOT_FLOATS = ("x", "y", "prev_x", "prev_y", "vel_x", "vel_y")
+SNAPSHOT_INTS = ("_moved_tick", "hits", "flags")
+SNAPSHOT_HIDDEN, SNAPSHOT_ALIVE, SNAPSHOT_POOLED, SNAPSHOT_PROJECTILE, SNAPSHOT_BULLET, SNAPSHOT_POSITIONAL = (1 << i for i in range(6))
+
+
+class SceneSnapshot:
+    """The state of a Scene's entities, in flat buffers: positions, velocities, `hidden`, `hits` and which Bullets were
+    out of their Pool. Images are kept as references, never pixels. The buffers only grow, so taking a snapshot into the
+    same SceneSnapshot every tick (for rollback) doesn't allocate once it's big enough"""
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self.capacity = 0
+        self.items = []
+        self.floats = array.array("d")
+        self.ints = array.array("q")
+        self.bullets = [] # (shooter, targets, damage, bounce, vel_x_start, vel_y_start) per Bullet, which Pools can change
+        self.swarms = {} # swarm -> (count, free, {field: array}, image names)
+        self.pool = {} # image name -> the Bullets that were free in the App's Pool
+        self.pool_active = 0
+        self.ticks = 0
+        self.random_state = None
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        extra = capacity - self.capacity
+        self.items.extend([None] * extra)
+        self.bullets.extend([None] * extra)
+        self.floats.extend([0.0] * (extra * len(SNAPSHOT_FLOATS)))
+        self.ints.extend([0] * (extra * len(SNAPSHOT_INTS)))
+        self.capacity = capacity
+
+    def capture(self, scene: Scene):
+        app = scene.app
+        blits = scene.blits
+        if len(blits) > self.capacity:
+            self._grow(max(len(blits), self.capacity * 2))
+
+        items, floats, ints = self.items, self.floats, self.ints
+        for i, item in enumerate(blits):
+            items[i] = item
+
+            self.bullets[i] = None
+            if isinstance(item, ProjectileSwarm):
+                # a reused snapshot might have had a Positional at this index
+                ints[i * 3 + 2] = 0
+                self._capture_swarm(item)
+                continue
+            if not isinstance(item, Positional):
+                ints[i * 3 + 2] = 0
+                continue
+
+            f = i * 6
+            floats[f] = item.x
+            floats[f + 1] = item.y
+            floats[f + 2] = item.prev_x
+            floats[f + 3] = item.prev_y
+
+            flags = SNAPSHOT_POSITIONAL | (SNAPSHOT_HIDDEN if item.hidden else 0)
+            if isinstance(item, Projectile):
+                floats[f + 4] = item.vel_x
+                floats[f + 5] = item.vel_y
+                flags |= SNAPSHOT_PROJECTILE | (SNAPSHOT_ALIVE if item.alive else 0) | (SNAPSHOT_POOLED if item.pooled else 0)
+            if isinstance(item, Bullet):
+                flags |= SNAPSHOT_BULLET
+                ints[i * 3 + 1] = item.hits
+                self.bullets[i] = item.shooter, item.targets, item.damage, item.bounce, item.vel_x_start, item.vel_y_start
+
+            ints[i * 3] = item._moved_tick
+            ints[i * 3 + 2] = flags
+
+        # forget what's past the end, so nothing is kept alive by an old snapshot
+        for i in range(len(blits), self.count):
+            items[i] = None
+            self.bullets[i] = None
+        self.count = len(blits)
+
+        for name, free in app.bullets.free.items():
+            if name in self.pool:
+                self.pool[name][:] = free
+            else:
+                self.pool[name] = list(free)
+        for name in self.pool:
+            if name not in app.bullets.free:
+                self.pool[name].clear()
+        self.pool_active = app.bullets.active
+
+        self.ticks = app.ticks
+        self.random_state = random.getstate()
+
+    def _capture_swarm(self, swarm: "ProjectileSwarm"):
+        saved = self.swarms.get(swarm)
+        if saved is None or len(saved[2]["x"]) < swarm.count:
+            arrays = {name: np.empty(max(swarm.count, 16), dtype=getattr(swarm, name).dtype) for name in SWARM_FIELDS}
+            saved = (0, [], arrays, np.empty(len(arrays["x"]), dtype=object), np.empty(len(arrays["x"]), dtype=object))
+
+        _, free, arrays, images, names = saved
+        count = swarm.count
+        for name, buffer in arrays.items():
+            buffer[:count] = getattr(swarm, name)[:count]
+        images[:count] = swarm.images[:count]
+        names[:count] = swarm.image_names[:count]
+        free[:] = swarm.free
+        self.swarms[swarm] = (count, free, arrays, images, names)
+
+    def restore(self, scene: Scene):
+        app = scene.app
+        count = self.count
+        items, floats, ints = self.items, self.floats, self.ints
+        scene.blits[:] = items[:count]
+
+        for i in range(count):
+            flags = ints[i * 3 + 2]
+            item = items[i]
+            if not flags & SNAPSHOT_POSITIONAL or isinstance(item, ProjectileSwarm):
+                continue
+
+            f = i * 6
+            item.x = floats[f]
+            item.y = floats[f + 1]
+            item.prev_x = floats[f + 2]
+            item.prev_y = floats[f + 3]
+            item._moved_tick = ints[i * 3]
+            item.hidden = bool(flags & SNAPSHOT_HIDDEN)
+
+            if flags & SNAPSHOT_PROJECTILE:
+                item.vel_x = floats[f + 4]
+                item.vel_y = floats[f + 5]
+                item.alive = bool(flags & SNAPSHOT_ALIVE)
+                item.pooled = bool(flags & SNAPSHOT_POOLED)
+            if flags & SNAPSHOT_BULLET:
+                item.hits = ints[i * 3 + 1]
+                item.shooter, item.targets, item.damage, item.bounce, item.vel_x_start, item.vel_y_start = self.bullets[i]
+
+        for swarm, (count, free, arrays, images, names) in self.swarms.items():
+            if swarm.capacity < count:
+                swarm._grow(count)
+            for name, buffer in arrays.items():
+                getattr(swarm, name)[:count] = buffer[:count]
+            swarm.images[:count] = images[:count]
+            swarm.image_names[:count] = names[:count]
+            swarm.alive[count:] = False
+            swarm.count = count
+            swarm.free[:] = free
+
+        app.bullets.free = {name: list(free) for name, free in self.pool.items() if free}
+        app.bullets.active = self.pool_active
+
+        app.ticks = self.ticks
+        random.setstate(self.random_state)
+
+    def to_bytes(self) -> bytes:
+        """Everything needed to rebuild the snapshot in another run: the buffers, plus a class name, an image name and
+        (for Bullets) the index of the shooter for every entity"""
+        index = {id(item): i for i, item in enumerate(self.items[:self.count])}
+        version, state, gauss = self.random_state
+
+        out = bytearray(SNAPSHOT_MAGIC)
+        out += struct.pack("<qI", self.ticks, self.count)
+        out += struct.pack(f"<I{len(state)}I", len(state), *state)
+        out += struct.pack("<Bd", gauss is not None, gauss or 0.0)
+
+        for i, item in enumerate(self.items[:self.count]):
+            flags = self.ints[i * 3 + 2]
+            if isinstance(item, ProjectileSwarm):
+                if item not in self.swarms:
+                    continue
+                out += self._swarm_bytes(item)
+                continue
+
+            name = type(item).__name__.encode()
+            image = (getattr(item, "image_name", None) or "").encode()
+            shooter = index.get(id(self.bullets[i][0]), -1) if flags & SNAPSHOT_BULLET else -1
+            out += struct.pack(f"<BB{len(name)}sB{len(image)}si", 0, len(name), name, len(image), image, shooter)
+            out += self.floats[i * 6:i * 6 + 6].tobytes() + self.ints[i * 3:i * 3 + 3].tobytes()
+            if flags & SNAPSHOT_BULLET:
+                damage = self.bullets[i][2]
+                out += struct.pack("<BdBdd", damage is not None, damage or 0, self.bullets[i][3], *self.bullets[i][4:])
+        return bytes(out)
+
+    def _swarm_bytes(self, swarm: "ProjectileSwarm") -> bytes:
+        count, free, arrays, _, names = self.swarms[swarm]
+        if any(names[i] is None for i in range(count) if arrays["alive"][i]):
+            raise Exception("Only ProjectileSwarms whose Projectiles were added with image names can be saved")
+
+        out = bytearray(struct.pack("<BI", 1, count))
+        for name in SWARM_FIELDS:
+            out += arrays[name][:count].tobytes()
+        for i in range(count):
+            image = (names[i] or "").encode()
+            out += struct.pack(f"<B{len(image)}s", len(image), image)
+        out += struct.pack(f"<I{len(free)}I", len(free), *free)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, scene: Scene, data: bytes) -> "SceneSnapshot":
+        """Rebuilds a snapshot from `to_bytes` onto `scene`'s entities and restores it"""
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise Exception("Not a scene snapshot")
+        app = scene.app
+
+        offset = len(SNAPSHOT_MAGIC)
+        ticks, count = struct.unpack_from("<qI", data, offset)
+        offset += 12
+        length, = struct.unpack_from("<I", data, offset)
+        state = struct.unpack_from(f"<{length}I", data, offset + 4)
+        offset += 4 + length * 4
+        has_gauss, gauss = struct.unpack_from("<Bd", data, offset)
+        offset += 9
+
+        # entities from `ready` get matched up by type and image, in order. Bullets come out of the Pool
+        available = {}
+        for item in scene.blits:
+            if isinstance(item, Bullet):
+                app.bullets.release(item)
+            else:
+                key = type(item).__name__, getattr(item, "image_name", None) or ""
+                available.setdefault(key, []).append(item)
+        for items in available.values():
+            items.reverse()
+
+        snapshot = cls(max(count, 16))
+        shooters = []
+        for i in range(count):
+            kind, = struct.unpack_from("<B", data, offset)
+            if kind == 1:
+                offset = snapshot._swarm_from_bytes(available, data, offset + 1, i)
+                continue
+
+            length = data[offset + 1]
+            name = data[offset + 2:offset + 2 + length].decode()
+            offset += 2 + length
+            length = data[offset]
+            image = data[offset + 1:offset + 1 + length].decode()
+            offset += 1 + length
+            shooter, = struct.unpack_from("<i", data, offset)
+            offset += 4
+
+            snapshot.floats[i * 6:i * 6 + 6] = array.array("d", data[offset:offset + 48])
+            snapshot.ints[i * 3:i * 3 + 3] = array.array("q", data[offset + 48:offset + 72])
+            offset += 72
+
+            if snapshot.ints[i * 3 + 2] & SNAPSHOT_BULLET:
+                has_damage, damage, bounce, vel_x_start, vel_y_start = struct.unpack_from("<BdBdd", data, offset)
+                offset += 26
+                item = app.bullets.acquire(None, image=image, pos=(0, 0))
+                snapshot.bullets[i] = [None, None, damage if has_damage else None, bool(bounce), vel_x_start, vel_y_start]
+                shooters.append((i, shooter))
+            elif available.get((name, image)):
+                item = available[(name, image)].pop()
+            else:
+                raise Exception(f"The snapshot has a {name} ({image or 'no image'}) that isn't in the scene")
+            snapshot.items[i] = item
+
+        for i, shooter in shooters:
+            snapshot.bullets[i][0] = snapshot.items[shooter] if shooter >= 0 else None
+            snapshot.bullets[i] = tuple(snapshot.bullets[i])
+
+        snapshot.count = count
+        snapshot.pool = {name: list(free) for name, free in app.bullets.free.items()}
+        snapshot.pool_active = app.bullets.active
+        snapshot.ticks = ticks
+        snapshot.random_state = (3, state, gauss if has_gauss else None)
+        snapshot.restore(scene)
+        return snapshot
+
+    def _swarm_from_bytes(self, available: dict, data: bytes, offset: int, i: int) -> int:
+        swarms = available.get(("ProjectileSwarm", ""))
+        if not swarms:
+            raise Exception("The snapshot has a ProjectileSwarm that isn't in the scene")
+        swarm = self.items[i] = swarms.pop()
+        self.ints[i * 3 + 2] = 0
+
+        count, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        arrays = {}
+        for name in SWARM_FIELDS:
+            dtype = getattr(swarm, name).dtype
+            size = dtype.itemsize * count
+            arrays[name] = np.frombuffer(data, dtype, count, offset).copy()
+            offset += size
+
+        names = np.empty(count, dtype=object)
+        images = np.empty(count, dtype=object)
+        for slot in range(count):
+            length = data[offset]
+            names[slot] = data[offset + 1:offset + 1 + length].decode() or None
+            images[slot] = swarm.app.load_image(names[slot]) if names[slot] else None
+            offset += 1 + length
+
+        length, = struct.unpack_from("<I", data, offset)
+        free = list(struct.unpack_from(f"<{length}I", data, offset + 4))
+        self.swarms[swarm] = (count, free, arrays, images, names)
+        return offset + 4 + length * 4
+
+
+class Widget:
+    """Retained-mode UI element. It renders into its own cached surface, and only renders and draws again once it's
+    invalidated (by changing its text, selection or style). Widgets draw straight to the screen, so scenes using them
+    shouldn't fill the screen every frame. Positions are screen coordinates"""
+    def __init__(self, app: App, *, pos: tuple = (0, 0), size: tuple = (0, 0)):
+        self.app = app
+        self.x, self.y = pos
+        self.width, self.height = size
+        self.parent = None
+        self.hidden = False
+
+        self.surface = None
+        self.dirty = True
+        self.damage = None # the parts (in widget coordinates) that need drawing, None for all of it
+        self.drawn = None # the screen rect it covered last time
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def invalidate(self, area: tuple = None):
+        """Marks the widget (or just `area` of it) to be rendered and drawn again"""
+        if area is None:
+            self.damage = None
+        elif self.damage is not None or not self.dirty:
+            self.damage = (self.damage or []) + [pygame.Rect(area)]
+        self.dirty = True
+
+        if self.parent:
+            self.parent.child_changed(self)
+
+    def render(self) -> pygame.Surface:
+        """Override this to return the widget's surface"""
+        return pygame.Surface((self.width, self.height))
+
+    def _mark(self, rects: list):
+        if self.app.dirty_rects:
+            for rect in rects:
+                self.app.mark_dirty(rect)
+
+    def draw(self, force: bool = False) -> list:
+        """Draws the widget if it changed since the last time (or if `force`). Returns the screen rects it drew to"""
+        if self.hidden or not (force or self.dirty):
+            return []
+
+        if self.dirty or self.surface is None:
+            self.surface = self.render()
+
+        if force or self.damage is None:
+            areas = [self.surface.get_rect()]
+        else:
+            areas = self.damage
+
+        screen = self.app.screen
+        rects = [screen.blit(self.surface, (self.x + area.x, self.y + area.y), area) for area in areas]
+        self._mark(rects)
+
+        if force or self.damage is None:
+            self.drawn = rects[0]
+        self.dirty = False
+        self.damage = []
+        return rects
+
+
+class Label(Widget):
+    """A line of text"""
+    def __init__(self, app: App, text: str, *, pos: tuple = (0, 0), color: tuple = DEFAULT_TEXT_COLOR, background: tuple = None, font: pygame.font.Font = None, antialias: bool = True):
+        super().__init__(app, pos=pos)
+        self.text = text
+        self.color = color
+        self.background = background
+        self.font = font
+        self.antialias = antialias
+        self.width, self.height = self.get_font().size(text)
+
+    def get_font(self) -> pygame.font.Font:
+        return self.font or self.app.font_main
+
+    def render(self) -> pygame.Surface:
+        return self.get_font().render(self.text, self.antialias, self.color, self.background)
+
+    def set_text(self, text: str):
+        if text != self.text:
+            self.text = text
+            self._restyle()
+
+    def set_style(self, *, color: tuple = None, background: tuple = None, font: pygame.font.Font = None):
+        self.color = color or self.color
+        self.background = background or self.background
+        self.font = font or self.font
+        self._restyle()
+
+    def _restyle(self):
+        size = self.width, self.height
+        self.width, self.height = self.get_font().size(self.text)
+        self.invalidate()
+
+        # a different size moves everything after it in the Panel
+        if self.parent and (self.width, self.height) != size and self.parent.layout:
+            self.parent.arrange()
+            self.parent.invalidate()
+
+
+class ListView(Widget):
+    """A scrolling list of text entries with one selected. Every entry gets rendered once per look (selected or not)
+    and cached, so moving the selection only redraws two rows, and scrolling a few rows shifts what's already there
+    and only draws the rows that came into view"""
+    def __init__(
+        self, app: App, items: list, *, pos: tuple = (0, 0), size: tuple = (300, 200), font: pygame.font.Font = None,
+        color: tuple = (0, 0, 0), background: tuple = (250, 250, 250), selected_color: tuple = (0, 150, 40), selected_background: tuple = None,
+        row_height: int = None, padding: int = 0
+    ):
+        super().__init__(app, pos=pos, size=size)
+        self.items = list(items)
+        self.font = font
+        self.color = color
+        self.background = background
+        self.selected_color = selected_color
+        self.selected_background = selected_background
+        self.row_height = row_height
+        self.padding = padding
+
+        self.selected = 0
+        self.scroll = 0 # the first row on screen
+        self.shift = 0 # rows scrolled since the last render
+        self.rows = {} # (index, selected) -> Surface
+        self.changed_rows = set()
+
+    @property
+    def visible(self) -> int:
+        """How many rows fit"""
+        return max(1, (self.height - self.padding * 2) // self.get_row_height())
+
+    def get_font(self) -> pygame.font.Font:
+        return self.font or self.app.font_main
+
+    def get_row_height(self) -> int:
+        return self.row_height or self.get_font().get_linesize()
+
+    def row_rect(self, index: int) -> pygame.Rect:
+        height = self.get_row_height()
+        return pygame.Rect(0, self.padding + (index - self.scroll) * height, self.width, height)
+
+    def row(self, index: int, selected: bool) -> pygame.Surface:
+        surface = self.rows.get((index, selected))
+        if surface is None:
+            color, background = (self.selected_color, self.selected_background) if selected else (self.color, None)
+            surface = self.rows[(index, selected)] = self.get_font().render(str(self.items[index]), True, color, background)
+        return surface
+
+    def set_items(self, items: list):
+        self.items = list(items)
+        self.rows.clear()
+        self.selected = min(self.selected, max(len(self.items) - 1, 0))
+        self.scroll = min(self.scroll, max(len(self.items) - self.visible, 0))
+        self.invalidate()
+
+    def select(self, index: int):
+        """Selects an entry, scrolling to it if it's out of view"""
+        if not self.items:
+            return
+        index %= len(self.items)
+        if index == self.selected:
+            return
+
+        old, self.selected = self.selected, index
+        self.changed_rows.update((old, index))
+        if index < self.scroll:
+            self.scroll_to(index)
+        elif index >= self.scroll + self.visible:
+            self.scroll_to(index - self.visible + 1)
+        else:
+            self.invalidate(self.row_rect(old))
+            self.invalidate(self.row_rect(index))
+
+    def scroll_to(self, first: int):
+        first = max(0, min(first, len(self.items) - self.visible))
+        if first == self.scroll:
+            return
+
+        shift, self.scroll = first - self.scroll, first
+        if self.surface is None or self.damage is None or abs(self.shift + shift) >= self.visible:
+            self.invalidate()
+            return
+
+        # move the rows already drawn and only draw the ones that scrolled into view
+        self.shift += shift
+        if shift > 0:
+            self.changed_rows.update(range(first + self.visible - shift, first + self.visible))
+        else:
+            self.changed_rows.update(range(first, first - shift))
+        self.invalidate(self.surface.get_rect())
+
+    def render(self) -> pygame.Surface:
+        if self.surface is None or self.damage is None:
+            surface = pygame.Surface((self.width, self.height))
+            surface.fill(self.background)
+            rows = range(self.scroll, min(self.scroll + self.visible, len(self.items)))
+        else:
+            surface = self.surface # only the rows that changed get drawn over
+            if self.shift:
+                surface.set_clip((0, self.padding, self.width, self.visible * self.get_row_height()))
+                surface.scroll(dy=-self.shift * self.get_row_height())
+                surface.set_clip(None)
+            rows = [index for index in self.changed_rows if self.scroll <= index < self.scroll + self.visible]
+
+        for index in rows:
+            rect = self.row_rect(index)
+            surface.fill(self.background, rect)
+            surface.blit(self.row(index, index == self.selected), (self.padding, rect.y))
+
+        self.changed_rows.clear()
+        self.shift = 0
+        return surface
+
+
+class Panel(Widget):
+    """Holds other widgets, stacking them in a "column" or "row" (or leaving them where they are if `layout` is None).
+    Drawing a Panel only draws the children that changed, filling its `background` under them first. Without a
+    background the Panel can't erase anything, so it's best used for the root of a UI"""
+    def __init__(self, app: App, *, pos: tuple = (0, 0), size: tuple = None, background: tuple = None, layout: str = None, spacing: int = 0, padding: int = 0):
+        super().__init__(app, pos=pos, size=size or app.size)
+        self.background = background
+        self.layout = layout
+        self.spacing = spacing
+        self.padding = padding
+
+        self.children = []
+        self.changed = []
+
+    def add(self, widget: Widget) -> Widget:
+        widget.parent = self
+        self.children.append(widget)
+        self.arrange()
+        self.invalidate()
+        return widget
+
+    def remove(self, widget: Widget):
+        self.children.remove(widget)
+        widget.parent = None
+        self.arrange()
+        self.invalidate()
+
+    def arrange(self):
+        if not self.layout:
+            return
+
+        offset = self.padding
+        for child in self.children:
+            if self.layout == "column":
+                child.x, child.y = self.x + self.padding, self.y + offset
+                offset += child.height + self.spacing
+            else:
+                child.x, child.y = self.x + offset, self.y + self.padding
+                offset += child.width + self.spacing
+
+    def child_changed(self, child: Widget):
+        if child not in self.changed:
+            self.changed.append(child)
+        self.dirty = True
+        if self.parent:
+            self.parent.child_changed(self)
+
+    def draw(self, force: bool = False) -> list:
+        if self.hidden or not (force or self.dirty):
+            return []
+
+        # children can't draw outside of the Panel
+        screen = self.app.screen
+        clip = screen.get_clip()
+        screen.set_clip(clip.clip(self.rect))
+
+        rects = []
+        if force or self.damage is None:
+            if self.background:
+                rects.append(screen.fill(self.background, self.rect))
+                self._mark(rects)
+            for child in self.children:
+                rects += child.draw(force=True)
+            self.drawn = self.rect
+        else:
+            for child in self.changed:
+                # whatever the child covered before might not get covered again
+                if self.background and child.damage is None and child.drawn:
+                    fill = screen.fill(self.background, child.drawn)
+                    self._mark([fill])
+                    rects.append(fill)
+                rects += child.draw()
+
+        screen.set_clip(clip)
+        self.changed.clear()
+        self.dirty = False
+        self.damage = []
+        return rects
+
 
 class Menu(Scene):
     def __init__(
@@ -251,61 +2585,82 @@ class Menu(Scene):
         if len(self.names) != len(self.scenes):
             raise Exception("`names` and `scenes` must be tuples of the same length")
 
+        # key -> what it does in this menu, every key_* can be one key or a tuple of them
+        self.key_actions = {}
+        for action, keys in (("exit", key_exit), ("select", key_select), ("backward", key_backward), ("forward", key_forward)):
+            if keys is None:
+                continue
+            for key in (keys if isinstance(keys, tuple) else (keys,)):
+                self.key_actions[key] = action
+
+        # the retained UI, built the first time the menu is shown
+        self.ui = None
+        self.list = None
+
     def _ready(self):
         """Override `ready` instead!"""
         self.selected = 0
 
+        if self.ui is None:
+            self.ui = self.build_ui()
+        self.list.select(0)
+        self.ui.invalidate() # everything gets drawn the first time
+
+    def build_ui(self) -> Panel:
+        """Override this to lay the menu out differently. It has to set `list` to the ListView showing `names`"""
+        ui = Panel(self.app, background=(250, 250, 250))
+        self.list = ui.add(ListView(self.app, self.names, pos=(20, 20), size=(self.app.width - 40, self.app.height - 40)))
+        return ui
+
     def ready(self):
         """Override this to run things (like music) before your menu!"""
         pass
 
     def loop(self, key: int):
-        """Don't override this unless you know what you're doing!"""
-        if key == self.key_forward: 
-            if self.sound_change:
-                self.app.get_sound(self.sound_change).play()
-            
-            self.selected += 1
-
-        elif key == self.key_backward:
-            if self.sound_change:
-                self.app.get_sound(self.sound_change).play()
-            
-            self.selected -= 1
-
-        elif key == self.key_select:
-            if self.sound_select:
-                self.app.get_sound(self.sound_select).play()
-            
-            self.app.play_scene(self.scenes[self.selected])
-            self.selected = 0
-
-        elif key == self.key_exit and self.parent:
-            if self.sound_exit:
-                self.app.get_sound(self.sound_exit).play()
-            
-            self.app.play_scene(self.parent)
-            self.selected = 0
-
-        if self.selected > len(self.names) - 1:
-            self.selected = 0
-        elif self.selected < 0:
-            self.selected = len(self.names) - 1
-
+        """Don't override this unless you know what you're doing! Handles every key pressed this frame, not just `key`"""
+        for key in self.app.input.keys:
+            action = self.key_actions.get(key)
+
+            if action == "forward":
+                if self.sound_change:
+                    self.app.play_sound(self.sound_change)
+                
+                self.selected += 1
+
+            elif action == "backward":
+                if self.sound_change:
+                    self.app.play_sound(self.sound_change)
+                
+                self.selected -= 1
+
+            elif action == "select":
+                if self.scenes[self.selected] is None:
+                    continue
+
+                if self.sound_select:
+                    self.app.play_sound(self.sound_select, priority=1)
+                
+                self.app.play_scene(self.scenes[self.selected])
+                self.selected = 0
+                break
+
+            elif action == "exit" and self.parent:
+                if self.sound_exit:
+                    self.app.play_sound(self.sound_exit, priority=1)
+                
+                self.app.play_scene(self.parent)
+                self.selected = 0
+                break
+
+            self.selected %= len(self.names)
+
+        if self.list:
+            self.list.select(self.selected)
         self.render()
 
     def render(self):
-        """Override this to render the menu, or leave as default"""
-        self.app.screen.fill((250, 250, 250))
-
-        for i in range(len(self.names)):
-            if i == self.selected:
-                color = (0, 150, 40)
-            else:
-                color = (0, 0, 0)
-
-            text = self.app.text(self.names[i], color=color)
-            text.blit((20, 20))
+        """Draws whatever changed in the menu's UI. Override `build_ui` to change how it looks, or this to draw it yourself"""
+        self.ui.draw()
 
 
 class ObstacleScene(Scene):
@@ -315,6 +2670,7 @@ class ObstacleScene(Scene):
         self.obstacles = obstacles
 
     def load(self):
+        """Makes the obstacles solid again, indexing them into their Teams"""
         for obstacle in self.obstacles:
             obstacle.enable()
     
@@ -327,7 +2683,7 @@ class SceneQuit(Scene):
     def __init__(self, app: App):
         self.app = app
 
-    def loop(self):
+    def loop(self, key: int = None):
         self.app.running = False
 
 
@@ -341,24 +2697,63 @@ class Positional:
         self.app = app
         self.x, self.y = pos
 
+        # where we were before the last tick, for interpolated drawing
+        self.prev_x, self.prev_y = pos
+        self._moved_tick = -1
+
         self.hidden = False
+        self.layer = 0 # RenderQueues draw lower layers first
+        self.screen_space = False # True for things like HUDs that shouldn't move with the camera
+
+    def remember_pos(self):
+        """Call this before moving the item in a tick, so it can be drawn in between (`move` and `step` do this for you)"""
+        ticks = self.app.ticks
+        if self._moved_tick != ticks:
+            self.prev_x, self.prev_y = self.x, self.y
+            self._moved_tick = ticks
+
+    def screen_pos(self) -> tuple:
+        """Where to draw the item right now: in between the last two ticks if it moved, and relative to the camera"""
+        x, y = self.x, self.y
+
+        alpha = self.app.alpha
+        if alpha < 1 and self._moved_tick == self.app.ticks - 1:
+            x = self.prev_x + (x - self.prev_x) * alpha
+            y = self.prev_y + (y - self.prev_y) * alpha
+
+        camera = self.app.camera
+        if camera and not self.screen_space:
+            offset_x, offset_y = camera.offset()
+            return x - offset_x, y - offset_y
+        return x, y
 
     def blit(self, pos: tuple = None):
         """Blits the Positional object to the screen where it is"""
         if not self.hidden:
             if not pos:
-                pos = self.x, self.y
-            self.app.screen.blit(self.object, pos)
+                pos = self.screen_pos()
+            self.app.blit(self.object, pos)
+
+    def queue(self, queue: "RenderQueue"):
+        """Adds the Positional object to a RenderQueue instead of blitting it right away, unless the camera can't see it"""
+        if not self.hidden:
+            pos = self.screen_pos()
+            if self.app.camera and not self.screen_space:
+                if pos[0] >= self.app.width or pos[1] >= self.app.height or pos[0] + self.object.get_width() <= 0 or pos[1] + self.object.get_height() <= 0:
+                    return
+            queue.add(self.object, pos, self.layer)
 
 
 class Text(Positional):
-    """Text object that can be reused"""
-    def __init__(self, app: App, content: str, *, pos: tuple = (1, 1), color: tuple = (30, 10, 100), background: tuple = None, font: pygame.font.Font = None, antialias: bool = True):
+    """Text object that can be reused. Texts are drawn in screen space, set `screen_space` to False to put one in the world"""
+    def __init__(self, app: App, content: str, *, pos: tuple = (1, 1), color: tuple = DEFAULT_TEXT_COLOR, background: tuple = None, font: pygame.font.Font = None, antialias: bool = True):
         super().__init__(app, pos=pos)
+        self.screen_space = True
 
         self.content = content
         self.color = color
         self.background = background
+        self.antialias = antialias
 
         if font:
             self.font = font
@@ -369,10 +2764,12 @@ class Text(Positional):
 
 
 class Sprite(Positional):
-    """Sprites have their own x and y positions and have a function to limit them to the screen edges"""
+    """Sprites have their own x and y positions and have a function to limit them to the world edges"""
     def  __init__(self, app: App, *, image: str = None, color: tuple = DEFAULT_COLOR, size: tuple = (20, 20), pos: tuple = (1, 1)):
         super().__init__(app, pos=pos)
 
+        self.image_name = image
+
         if image:
             self.object = self.image = self.app.load_image(image)
 
@@ -390,8 +2787,15 @@ class Sprite(Positional):
 
         self.size = self.width, self.height
 
-        self.max_x = self.app.width - self.width
-        self.max_y = self.app.height - self.height
+        # pixels taken off every side of the hitbox, players in bullet hells usually want a few
+        self.shrink = 0
+
+        # the Animation playing, see `play`
+        self.animation = None
+        self.animation_start = 0
+
+        self.max_x = self.app.world_width - self.width
+        self.max_y = self.app.world_height - self.height
 
     def get_right(self):
         return self.x + self.width
@@ -400,7 +2804,7 @@ class Sprite(Positional):
         return self.y + self.height
 
     def restrict(self):
-        """If the Sprite has gone beyond the screen edges, teleport it back to the edge"""
+        """If the Sprite has gone beyond the world edges, teleport it back to the edge"""
         if self.x < 0:
             self.x = 0
         elif self.x > self.max_x:
@@ -411,7 +2815,47 @@ class Sprite(Positional):
         elif self.y > self.max_y:
             self.y = self.max_y
 
+    def play(self, animation: "Animation"):
+        """Starts playing `animation` from its first frame. Pass None to stop and keep the current frame"""
+        self.animation = animation
+        self.animation_start = self.app.ticks
+        if animation:
+            self.animate()
+
+    def animate(self):
+        """Shows the frame of the Animation for the current tick"""
+        self.object = self.image = self.animation.frame(self.app.ticks - self.animation_start)
+
+    def blit(self, pos: tuple = None):
+        if self.animation:
+            self.animate()
+        super().blit(pos)
+
+    def queue(self, queue: "RenderQueue"):
+        if self.animation:
+            self.animate()
+        super().queue(queue)
+
+    def hitbox(self) -> tuple:
+        """The (x, y, width, height) other things can hit"""
+        shrink = self.shrink
+        return self.x + shrink, self.y + shrink, self.width - shrink * 2, self.height - shrink * 2
+
+    def get_mask(self) -> pygame.Mask:
+        return self.app.get_mask(self.object, self.shrink)
+
+    def collides(self, other: "Sprite") -> bool:
+        """Pixel perfect collision check, only looking at the masks once the hitboxes overlap"""
+        x, y, w, h = self.hitbox()
+        other_x, other_y, other_w, other_h = other.hitbox()
+        if not (x < other_x + other_w and other_x < x + w and y < other_y + other_h and other_y < y + h):
+            return False
+
+        offset = round(other.x - self.x), round(other.y - self.y)
+        return self.get_mask().overlap(other.get_mask(), offset) is not None
+
     def move(self, xd: int = 0, yd: int = 0, *, check_collision: bool = True):
+        self.remember_pos()
         new_x = self.x + xd
         new_y = self.y + yd
         new_r = self.get_right() + xd
@@ -421,20 +2865,23 @@ class Sprite(Positional):
 
         if check_collision:
             for team in self.app.teams:
-                if self in team.members:
-                    for member in team.members:
-                        if isinstance(member, Obstacle):
-                            obs = member
-                            obs_r = obs.get_right()
-                            obs_b = obs.get_bottom()
-
-                            if (
-                                ((new_x < obs_r and new_x > obs.x) or
-                                (new_r > obs.x and new_r < obs_r)) and
-                                ((new_y > obs.y and new_y < obs_b) or
-                                (new_b > obs.y and new_b < obs_b))
-                            ):
-                                change = False
+                if self in team.member_set:
+                    if any(tilemap.blocked(new_x, new_y, self.width, self.height) for tilemap in team.tilemaps):
+                        change = False
+                        break
+
+                    for obs in team.get_obstacles(new_x, new_y, self.width, self.height):
+                        obs_r = obs.get_right()
+                        obs_b = obs.get_bottom()
+
+                        if (
+                            ((new_x < obs_r and new_x > obs.x) or
+                            (new_r > obs.x and new_r < obs_r)) and
+                            ((new_y > obs.y and new_y < obs_b) or
+                            (new_b > obs.y and new_b < obs_b))
+                        ):
+                            change = False
+                            break
         
         if change: 
             self.x = new_x
@@ -445,6 +2892,51 @@ class Sprite(Positional):
         projectile.x, projectile.y = self.x, self.y
 
 
+class Animation:
+    """Frames that Sprites play one after another with `Sprite.play`, each one shown for `frame_ticks` ticks.
+    The frames should all be the same size as the Sprite"""
+    def __init__(self, frames: list, *, frame_ticks: int = 6, loop: bool = True):
+        self.frames = frames
+        self.frame_ticks = frame_ticks
+        self.loop = loop
+
+    @classmethod
+    def from_atlas(cls, app: App, name: str, **kwargs) -> "Animation":
+        """The frames pack_atlas.py found for `name` (from images called name_0.png, name_1.png...)"""
+        animations = app.load_atlas()["animations"]
+        if name not in animations:
+            raise Exception(f"Animation '{name}' not found in the atlas")
+        return cls([app.load_image(filename) for filename in animations[name]], **kwargs)
+
+    @classmethod
+    def from_sheet(cls, app: App, filename: str, frame_size: tuple, *, count: int = None, **kwargs) -> "Animation":
+        """Cuts a sprite sheet image into frames of `frame_size`, left to right and then top to bottom"""
+        sheet = app.load_image(filename)
+        width, height = frame_size
+
+        frames = [
+            sheet.subsurface((x, y, width, height))
+            for y in range(0, sheet.get_height() - height + 1, height)
+            for x in range(0, sheet.get_width() - width + 1, width)
+        ]
+        return cls(frames[:count], **kwargs)
+
+    @property
+    def duration(self) -> int:
+        """How many ticks a single play through takes"""
+        return len(self.frames) * self.frame_ticks
+
+    def frame(self, ticks: int) -> pygame.Surface:
+        """The frame to show `ticks` ticks after starting"""
+        index = ticks // self.frame_ticks
+        if self.loop:
+            return self.frames[index % len(self.frames)]
+        return self.frames[min(index, len(self.frames) - 1)]
+
+    def finished(self, ticks: int) -> bool:
+        return not self.loop and ticks >= self.duration
+
+
 class Projectile(Sprite):
     """Projectiles are Sprites that move on their own, with the `velocity` parameter"""
     def __init__(self, app: App, *, image: str, pos: tuple = (1, 1), velocity: tuple = (0, 0), bounce: bool = False):
@@ -454,8 +2946,15 @@ class Projectile(Sprite):
         self.vel_x_start, self.vel_y_start = self.vel_x, self.vel_y
         self.bounce = bounce
 
+        # False once the Projectile left the screen (or a Bullet got spent), AUTO_step then removes it from its list
+        self.alive = True
+        # the Pool this came from, if any, AUTO_step gives it back once it's not alive anymore
+        self.pool = None
+        self.pooled = False
+
     def step(self):
         """Moves the Projectile in a step using its `velocity`"""
+        self.remember_pos()
         self.x += self.vel_x
         self.y += self.vel_y
 
@@ -474,7 +2973,7 @@ class Projectile(Sprite):
 
         else:
             if self.x > self.max_x+5 or self.x < -self.width-5 or self.y > self.max_y+5 or self.y < -self.height-5:
-                del self
+                self.alive = False
 
 
 class Bullet(Projectile):
@@ -490,45 +2989,1043 @@ class Bullet(Projectile):
         self.damage = damage
         self.hits = hits
 
+    def reset(self, shooter: Sprite, *, image: str, pos: tuple = None, velocity: tuple = (0, 0), bounce: bool = False, targets: tuple = None, hits: int = 1, damage: int = None):
+        """Sets the Bullet up again in place, for Pools. Takes the same arguments as creating one (`image` has to be the same!)"""
+        if not pos:
+            pos = shooter.x, shooter.y
+
+        self.x, self.y = self.prev_x, self.prev_y = pos
+        self._moved_tick = -1
+        self.hidden = False
+
+        self.vel_x, self.vel_y = self.vel_x_start, self.vel_y_start = velocity
+        self.bounce = bounce
+
+        self.shooter = shooter
+        self.targets = targets
+        self.damage = damage
+        self.hits = hits
+        self.alive = True
+
+    def can_hit(self, target) -> bool:
+        return target is not self and target is not self.shooter and (not self.targets or target in self.targets)
+
+    def hit(self, target) -> bool:
+        """Damages `target` and uses up one of the Bullet's `hits`. Returns False once the Bullet is spent"""
+        if hasattr(target, "take_damage"):
+            target.take_damage(self.damage)
+
+        if self.hits > -1:
+            self.hits -= 1
+            if self.hits <= 0:
+                self.alive = False
+
+        return self.alive
+
     def check(self):
-        """Checks if the Bullet hit something"""
+        """Checks if the Bullet hit something (use AUTO_collide to check lots of Bullets at once)"""
         for blit in self.app.blits:
-            if self.x - 5 < blit.x < self.x + 5 and self.y - 5 < blit.y < self.y + 5:
-                if (not self.targets or blit in self.targets) and blit != self.shooter and blit != self:
-                    if hasattr(blit, "take_damage"):
-                        blit.take_damage(self.damage)
+            if not self.alive:
+                break
+
+            if isinstance(blit, Sprite) and self.can_hit(blit) and self.collides(blit):
+                self.hit(blit)
+
+
+def _swarm_field(name: str):
+    def get(self):
+        return getattr(self.swarm, name)[self.slot].item()
+
+    def set(self, value):
+        getattr(self.swarm, name)[self.slot] = value
+
+    return property(get, set)
+
+
+class SwarmProjectile:
+    """A single Projectile inside a ProjectileSwarm. Reads and writes go straight to the swarm's arrays"""
+    x = _swarm_field("x")
+    y = _swarm_field("y")
+    vel_x = _swarm_field("vel_x")
+    vel_y = _swarm_field("vel_y")
+    width = _swarm_field("width")
+    height = _swarm_field("height")
+    max_x = _swarm_field("max_x")
+    max_y = _swarm_field("max_y")
+    bounce = _swarm_field("bounce")
+    alive = _swarm_field("alive")
+
+    def __init__(self, swarm: "ProjectileSwarm", slot: int):
+        self.swarm = swarm
+        self.app = swarm.app
+        self.slot = slot
+
+    @property
+    def object(self):
+        return self.swarm.images[self.slot]
+
+    image = object
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def get_right(self):
+        return self.x + self.width
+
+    def get_bottom(self):
+        return self.y + self.height
+
+    def screen_pos(self) -> tuple:
+        """Where the swarm draws this Projectile right now: in between the last two ticks, and relative to the camera"""
+        swarm = self.swarm
+        x, y = self.x, self.y
+
+        alpha = self.app.alpha
+        if alpha < 1 and swarm._stepped_tick == self.app.ticks - 1:
+            prev_x, prev_y = swarm.prev_x[self.slot], swarm.prev_y[self.slot]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+
+        camera = self.app.camera
+        if camera:
+            offset_x, offset_y = camera.offset()
+            return x - offset_x, y - offset_y
+        return x, y
+
+    def blit(self, pos: tuple = None):
+        if not self.swarm.hidden and self.alive:
+            if not pos:
+                pos = self.screen_pos()
+            self.app.blit(self.object, pos)
+
+    def kill(self):
+        self.swarm.remove(self.slot)
+
+    def __eq__(self, other):
+        return isinstance(other, SwarmProjectile) and other.swarm is self.swarm and other.slot == self.slot
+
+    def __hash__(self):
+        return hash((id(self.swarm), self.slot))
+
+
+SWARM_FIELDS = ("x", "y", "prev_x", "prev_y", "vel_x", "vel_y", "width", "height", "max_x", "max_y", "bounce", "alive")
+
+
+class ProjectileSwarm:
+    """Stores lots of Projectiles in NumPy arrays so they can be stepped, bounced and blitted all at once.
+    Use `add` instead of creating Projectiles; indexing or iterating the swarm gives you Projectile-like items"""
+    def __init__(self, app: App, *, capacity: int = 256):
+        if np is None:
+            raise ImportError("ProjectileSwarm needs numpy, install it with `pip install numpy`")
+
+        self.app = app
+        self.hidden = False
+        self.layer = 0
+
+        self.capacity = 0
+        self.count = 0 # slots in use, including dead ones waiting in `free`
+        self.free = []
+
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.prev_x = np.zeros(0)
+        self.prev_y = np.zeros(0)
+        self._stepped_tick = -1
+        self.vel_x = np.zeros(0)
+        self.vel_y = np.zeros(0)
+        self.width = np.zeros(0)
+        self.height = np.zeros(0)
+        self.max_x = np.zeros(0)
+        self.max_y = np.zeros(0)
+        self.bounce = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)
+        self.images = np.empty(0, dtype=object)
+        self.image_names = np.empty(0, dtype=object) # for snapshots, None if a Surface was passed
+
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        for name in SWARM_FIELDS + ("images", "image_names"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else np.empty(capacity, dtype=object)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+        self.capacity = capacity
+
+    def add(self, *, image: str|pygame.Surface, pos: tuple = (1, 1), velocity: tuple = (0, 0), bounce: bool = False) -> SwarmProjectile:
+        """Adds a Projectile to the swarm, same arguments as `Projectile`"""
+        image_name = image if isinstance(image, str) else None
+        if image_name:
+            image = self.app.load_image(image)
+
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow(max(self.capacity * 2, 16))
+            slot = self.count
+            self.count += 1
+
+        width, height = image.get_size()
+
+        self.x[slot], self.y[slot] = pos
+        self.prev_x[slot], self.prev_y[slot] = pos
+        self.vel_x[slot], self.vel_y[slot] = velocity
+        self.width[slot], self.height[slot] = width, height
+        self.max_x[slot] = self.app.world_width - width
+        self.max_y[slot] = self.app.world_height - height
+        self.bounce[slot] = bounce
+        self.alive[slot] = True
+        self.images[slot] = image
+        self.image_names[slot] = image_name
+
+        return SwarmProjectile(self, slot)
+
+    def remove(self, slot: int):
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.images[slot] = None
+            self.image_names[slot] = None
+            self.free.append(slot)
+
+    def clear(self):
+        self.count = 0
+        self.free.clear()
+        self.alive[:] = False
+        self.images[:] = None
+        self.image_names[:] = None
+
+    def slots(self):
+        """Indices of the living Projectiles"""
+        return np.flatnonzero(self.alive[:self.count])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __iter__(self):
+        for slot in self.slots().tolist():
+            yield SwarmProjectile(self, slot)
+
+    def __getitem__(self, slot: int) -> SwarmProjectile:
+        if not 0 <= slot < self.count or not self.alive[slot]:
+            raise IndexError(f"No Projectile in slot {slot}")
+        return SwarmProjectile(self, slot)
+
+    def step(self):
+        """Moves every Projectile by its velocity, bouncing or culling them like `Projectile.step` does"""
+        n = self.count
+        alive = self.alive[:n]
+        x, y = self.x[:n], self.y[:n]
+        vel_x, vel_y = self.vel_x[:n], self.vel_y[:n]
+        max_x, max_y = self.max_x[:n], self.max_y[:n]
+
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self._stepped_tick = self.app.ticks
+
+        x += vel_x
+        y += vel_y
+
+        bounce = self.bounce[:n] & alive
+
+        low = bounce & (x <= 0)
+        high = bounce & ~low & (x >= max_x)
+        x[low] = 0
+        x[high] = max_x[high]
+        vel_x[low] = np.abs(vel_x[low])
+        vel_x[high] = -np.abs(vel_x[high])
+
+        low = bounce & (y <= 0)
+        high = bounce & ~low & (y >= max_y)
+        y[low] = 0
+        y[high] = max_y[high]
+        vel_y[low] = np.abs(vel_y[low])
+        vel_y[high] = -np.abs(vel_y[high])
+
+        gone = alive & ~bounce & (
+            (x > max_x + 5) | (x < -self.width[:n] - 5) | (y > max_y + 5) | (y < -self.height[:n] - 5)
+        )
+        if gone.any():
+            dead = np.flatnonzero(gone)
+            alive[dead] = False
+            self.images[dead] = None
+            self.free.extend(dead.tolist())
+
+    def _draws(self):
+        """(surface, pos) pairs for every living Projectile"""
+        slots = self.slots()
+        x, y = self.x[slots], self.y[slots]
+
+        alpha = self.app.alpha
+        if alpha < 1 and self._stepped_tick == self.app.ticks - 1:
+            prev_x, prev_y = self.prev_x[slots], self.prev_y[slots]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+
+        camera = self.app.camera
+        if camera:
+            offset_x, offset_y = camera.offset()
+            x = x - offset_x
+            y = y - offset_y
+
+            seen = (x < self.app.width) & (y < self.app.height) & (x + self.width[slots] > 0) & (y + self.height[slots] > 0)
+            slots, x, y = slots[seen], x[seen], y[seen]
+
+        return zip(self.images[slots], zip(x.tolist(), y.tolist()))
+
+    def blit(self):
+        """Blits every living Projectile with one `Surface.blits` call"""
+        if not self.hidden:
+            self.app.blit_many(self._draws())
+
+    def queue(self, queue: "RenderQueue"):
+        if not self.hidden:
+            queue.extend(self._draws(), self.layer)
+
+
+class RenderQueue:
+    """Collects (surface, pos) pairs for a frame in layers, then draws each layer with a single `Surface.blits` call.
+    Lower layers get drawn first, and with `sort_textures` the items inside a layer are grouped by surface"""
+    def __init__(self, app: App, *, sort_textures: bool = False):
+        self.app = app
+        self.sort_textures = sort_textures
+        self.layers = {}
+
+    def add(self, surface: pygame.Surface, pos: tuple, layer: int = 0):
+        if layer in self.layers:
+            self.layers[layer].append((surface, pos))
+        else:
+            self.layers[layer] = [(surface, pos)]
+
+    def extend(self, draws, layer: int = 0):
+        if layer in self.layers:
+            self.layers[layer].extend(draws)
+        else:
+            self.layers[layer] = list(draws)
+
+    def flush(self):
+        """Draws everything queued and empties the queue"""
+        for layer in sorted(self.layers):
+            draws = self.layers[layer]
+            if self.sort_textures:
+                draws.sort(key=lambda draw: id(draw[0]))
+            self.app.blit_many(draws)
+        self.layers.clear()
+
+    def __len__(self):
+        return sum(len(draws) for draws in self.layers.values())
+
 
-                    if self.hits > -1:
-                        self.hits -= 1
-                        if self.hits <= 0:
-                            del self  
+class Pool:
+    """Keeps retired objects (like Bullets) around and reuses them instead of creating new ones.
+    `acquire` takes the same arguments as creating one, reused objects get them through their `reset` method"""
+    def __init__(self, app: App, cls: type):
+        self.app = app
+        self.cls = cls
+
+        self.free = {} # image name -> retired objects using that image
+
+        self.active = 0
+        self.high_water = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        free = self.free.get(kwargs.get("image"))
+        if free:
+            obj = free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(self.app, *args, **kwargs)
+            obj.pool = self
+            self.created += 1
+
+        obj.pooled = False
+        self.active += 1
+        if self.active > self.high_water:
+            self.high_water = self.active
+        return obj
+
+    def release(self, obj) -> bool:
+        """Gives an object back to the Pool. AUTO_step does this for you once it's not alive anymore"""
+        if obj.pooled:
+            return False
+
+        obj.pooled = True
+        obj.alive = False
+        self.active -= 1
+
+        if obj.image_name in self.free:
+            self.free[obj.image_name].append(obj)
+        else:
+            self.free[obj.image_name] = [obj]
+        return True
+
+    def prewarm(self, count: int, *args, **kwargs):
+        """Creates `count` objects up front, so acquiring them later is cheap"""
+        for _ in range(count):
+            obj = self.cls(self.app, *args, **kwargs)
+            obj.pool = self
+            obj.pooled = True
+            obj.alive = False
+            self.created += 1
+            self.free.setdefault(obj.image_name, []).append(obj)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "free": sum(len(free) for free in self.free.values()),
+            "high_water": self.high_water,
+            "created": self.created,
+            "reused": self.reused,
+        }
 
 
 class Obstacle(Sprite):
     """Obstacles are solid objects that block other Sprites"""
-    def __init__(self, scene: Scene, *, color: tuple = DEFAULT_COLOR, size: tuple = (20, 20), pos: tuple = (1, 1), ):
-        super().__init__(scene.app, color=color, size=size, pos=pos)
+    def __init__(self, scene: Scene|App, *, color: tuple = DEFAULT_COLOR, size: tuple = (20, 20), pos: tuple = (1, 1), ):
+        if isinstance(scene, Scene):
+            scene = scene.app
+        super().__init__(scene, color=color, size=size, pos=pos)
+
+        self.enabled = True
+        self.teams = []
+
+    def enable(self):
+        self.enabled = True
+        for team in self.teams:
+            team.index(self)
 
+    def disable(self):
+        self.enabled = False
+        for team in self.teams:
+            team.unindex(self)
+
+
+class TileMap:
+    """Static level geometry on a grid. `rows` are strings (or lists) of tile keys, and `tiles` maps each key to an image
+    filename or a color, with anything else left empty. The tiles are baked into chunk surfaces of `chunk_size` x `chunk_size`
+    tiles, which only get baked again when a tile in them changes, and only the chunks on screen get drawn.
+    Add the TileMap to a Team to make its `solid` tiles block the Team's Sprites"""
+    def __init__(self, app: App, rows: list, tiles: dict, *, tile_size: int = 32, chunk_size: int = 16, solid: set = (), pos: tuple = (0, 0)):
+        self.app = app
+        self.x, self.y = pos
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.tiles = tiles
+        self.solid = set(solid)
+
+        self.columns = max(len(row) for row in rows)
+        self.rows = [list(row) + [None] * (self.columns - len(row)) for row in rows]
+        self.width = self.columns * tile_size
+        self.height = len(self.rows) * tile_size
+
+        # one byte per tile, so checking a tile is a single lookup
+        self.collision = bytearray(self.columns * len(self.rows))
+        for row, keys in enumerate(self.rows):
+            for column, key in enumerate(keys):
+                if key in self.solid:
+                    self.collision[row * self.columns + column] = 1
+
+        self.chunks = {}
+        self.dirty = set() # chunks that have to be baked again before they're drawn
+
+        self.hidden = False
+        self.layer = -1 # under everything else by default
+
+    @classmethod
+    def load(cls, app: App, filename: str, tiles: dict, **kwargs) -> "TileMap":
+        """Loads a map from a text file in the maps folder, one row of tile keys per line"""
+        rows = app.read_asset(app.map_subdir, filename).decode().splitlines()
+        return cls(app, rows, tiles, **kwargs)
+
+    def get_tile(self, column: int, row: int):
+        return self.rows[row][column]
+
+    def set_tile(self, column: int, row: int, key):
+        """Changes a tile, marking its chunk to be baked again"""
+        if self.rows[row][column] == key:
+            return
+
+        self.rows[row][column] = key
+        self.collision[row * self.columns + column] = key in self.solid
+        self.dirty.add((column // self.chunk_size, row // self.chunk_size))
+
+    def solid_at(self, column: int, row: int) -> bool:
+        if 0 <= column < self.columns and 0 <= row < len(self.rows):
+            return self.collision[row * self.columns + column] == 1
+        return False
+
+    def blocked(self, x: float, y: float, w: float, h: float) -> bool:
+        """Whether the rect overlaps any solid tile, looking only at the tiles under it"""
+        size = self.tile_size
+        left = max(int((x - self.x) // size), 0)
+        top = max(int((y - self.y) // size), 0)
+        right = min(int((x - self.x + w - 1) // size), self.columns - 1)
+        bottom = min(int((y - self.y + h - 1) // size), len(self.rows) - 1)
+
+        collision = self.collision
+        for row in range(top, bottom + 1):
+            start = row * self.columns
+            if 1 in collision[start + left:start + right + 1]:
+                return True
+        return False
+
+    def bake(self, column: int, row: int) -> pygame.Surface:
+        """Draws every tile of a chunk onto its surface"""
+        size = self.tile_size
+        pixels = self.chunk_size * size
+
+        # always a new surface, so dirty rect mode sees the chunk changed
+        surface = pygame.Surface((pixels, pixels), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+
+        draws = []
+        first_column, first_row = column * self.chunk_size, row * self.chunk_size
+        for y, keys in enumerate(self.rows[first_row:first_row + self.chunk_size]):
+            for x, key in enumerate(keys[first_column:first_column + self.chunk_size]):
+                tile = self.tiles.get(key)
+                if isinstance(tile, str):
+                    draws.append((self.app.load_image(tile), (x * size, y * size)))
+                elif tile is not None:
+                    surface.fill(tile, (x * size, y * size, size, size))
+        surface.blits(draws, doreturn=False)
+
+        self.chunks[(column, row)] = surface
+        self.dirty.discard((column, row))
+        return surface
+
+    def _draws(self) -> list:
+        """The (surface, pos) of every chunk on screen, baking the ones that changed first"""
+        camera = self.app.camera
+        offset_x, offset_y = camera.offset() if camera else (0, 0)
+
+        pixels = self.chunk_size * self.tile_size
+        left = max(int((offset_x - self.x) // pixels), 0)
+        top = max(int((offset_y - self.y) // pixels), 0)
+        right = min(int((offset_x - self.x + self.app.width) // pixels), (self.columns - 1) // self.chunk_size)
+        bottom = min(int((offset_y - self.y + self.app.height) // pixels), (len(self.rows) - 1) // self.chunk_size)
+
+        draws = []
+        for row in range(top, bottom + 1):
+            for column in range(left, right + 1):
+                surface = self.chunks.get((column, row))
+                if surface is None or (column, row) in self.dirty:
+                    surface = self.bake(column, row)
+                draws.append((surface, (self.x + column * pixels - offset_x, self.y + row * pixels - offset_y)))
+        return draws
+
+    def blit(self):
+        if not self.hidden:
+            self.app.blit_many(self._draws())
+
+    def queue(self, queue: "RenderQueue"):
+        if not self.hidden:
+            queue.extend(self._draws(), self.layer)
+
+
+NET_PORT = 47800
+NET_SNAPSHOT = b"ES" # server -> client: a (fragment of a) snapshot
+NET_ACK = b"EA" # client -> server: the newest snapshot it has, and the keys it's holding
+NET_HEADER = "<2sIIBB" # magic, sequence (the server's tick), baseline sequence, fragment index, fragment count
+NET_NO_BASELINE = 0xFFFFFFFF
+NET_QUANTUM = 8 # positions and velocities are sent in 1/8 pixel steps
+NET_FIELDS = ("x", "y", "vel_x", "vel_y", "hits", "hidden")
+
+
+def _write_uvarint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_uvarint(data: bytes, offset: int) -> tuple:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def _write_varint(out: bytearray, value: int):
+    _write_uvarint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+def _read_varint(data: bytes, offset: int) -> tuple:
+    value, offset = _read_uvarint(data, offset)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), offset
+
+def _predict(state: tuple, ticks: int) -> tuple:
+    """Dead reckoning: where an entity would be `ticks` ticks later if it kept its velocity"""
+    x, y, vel_x, vel_y, hits, hidden = state
+    return x + vel_x * ticks, y + vel_y * ticks, vel_x, vel_y, hits, hidden
+
+
+def encode_snapshot(state: dict, kinds: dict, baseline: dict = None, ticks: int = 0) -> bytes:
+    """Encodes `state` (net id -> quantized NET_FIELDS) against `baseline`, the snapshot from `ticks` ticks ago the
+    client has. Entities only cost anything if they're new, gone, or not where dead reckoning from the baseline puts them.
+    New ones carry their image name from `kinds`"""
+    baseline = baseline or {}
+    spawned, changed = bytearray(), bytearray()
+    spawn_count = change_count = 0
+
+    for net_id, values in state.items():
+        base = baseline.get(net_id)
+        if base is None:
+            spawn_count += 1
+            _write_uvarint(spawned, net_id)
+            name = kinds[net_id].encode()
+            spawned.append(len(name))
+            spawned += name
+            for value in values:
+                _write_varint(spawned, value)
+            continue
+
+        predicted = _predict(base, ticks)
+        if values == predicted:
+            continue
+
+        change_count += 1
+        mask = 0
+        for i, (value, guess) in enumerate(zip(values, predicted)):
+            if value != guess:
+                mask |= 1 << i
+        _write_uvarint(changed, net_id)
+        changed.append(mask)
+        for i, (value, guess) in enumerate(zip(values, predicted)):
+            if mask & 1 << i:
+                _write_varint(changed, value - guess)
+
+    removed = [net_id for net_id in baseline if net_id not in state]
+
+    out = bytearray()
+    _write_uvarint(out, spawn_count)
+    out += spawned
+    _write_uvarint(out, change_count)
+    out += changed
+    _write_uvarint(out, len(removed))
+    for net_id in removed:
+        _write_uvarint(out, net_id)
+    return bytes(out)
+
+def decode_snapshot(data: bytes, baseline: dict = None, ticks: int = 0) -> tuple:
+    """The other side of `encode_snapshot`. Returns the full state and the image names of the new entities"""
+    baseline = baseline or {}
+    state = {net_id: _predict(values, ticks) for net_id, values in baseline.items()}
+    kinds = {}
+
+    count, offset = _read_uvarint(data, 0)
+    for _ in range(count):
+        net_id, offset = _read_uvarint(data, offset)
+        length = data[offset]
+        kinds[net_id] = bytes(data[offset + 1:offset + 1 + length]).decode()
+        offset += 1 + length
+
+        values = []
+        for _ in NET_FIELDS:
+            value, offset = _read_varint(data, offset)
+            values.append(value)
+        state[net_id] = tuple(values)
+
+    count, offset = _read_uvarint(data, offset)
+    for _ in range(count):
+        net_id, offset = _read_uvarint(data, offset)
+        mask = data[offset]
+        offset += 1
+
+        values = list(state[net_id])
+        for i in range(len(NET_FIELDS)):
+            if mask & 1 << i:
+                delta, offset = _read_varint(data, offset)
+                values[i] += delta
+        state[net_id] = tuple(values)
+
+    count, offset = _read_uvarint(data, offset)
+    for _ in range(count):
+        net_id, offset = _read_uvarint(data, offset)
+        state.pop(net_id, None)
+
+    return state, kinds
+
+
+class NetPeer:
+    """A client, as the NetServer sees it"""
+    def __init__(self, address: tuple):
+        self.address = address
+        self.acked = None # newest snapshot the client said it has
+        self.keys = KeyState(set())
+        self.last_seen = time.perf_counter()
+
+
+class NetServer:
+    """Sends the state of a list of entities to every client that talks to it, over UDP. Every Sprite with an `image_name`
+    gets a net id, and every tick's snapshot is sent as a delta against the newest one the client acknowledged.
+    Snapshots bigger than `mtu` get split into fragments. The clients' held keys come back with their acks"""
+    def __init__(self, app: App, *, host: str = "0.0.0.0", port: int = NET_PORT, mtu: int = 1200, history: int = 64, timeout: float = 5.0):
+        self.app = app
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+
+        self.mtu = mtu
+        self.history = history
+        self.timeout = timeout
+
+        self.ids = {} # entity -> net id
+        self.next_id = 1
+        self.kinds = {} # net id -> image name
+        self.snapshots = {} # sequence -> state, the last `history` of them
+        self.peers = {} # address -> NetPeer
+
+        self.bytes_sent = 0
+        self.packets_sent = 0
+
+    def capture(self, entities: list) -> dict:
+        """Quantizes the entities into a snapshot state, giving new ones net ids and forgetting the ones that are gone"""
+        state = {}
+        ids = {}
+        for entity in entities:
+            if not isinstance(entity, Positional) or not getattr(entity, "image_name", None) or getattr(entity, "alive", True) is False:
+                continue
+
+            net_id = self.ids.get(entity)
+            if net_id is None:
+                net_id = self.next_id
+                self.next_id += 1
+                self.kinds[net_id] = entity.image_name
+            ids[entity] = net_id
+
+            state[net_id] = (
+                round(entity.x * NET_QUANTUM), round(entity.y * NET_QUANTUM),
+                round(getattr(entity, "vel_x", 0) * NET_QUANTUM), round(getattr(entity, "vel_y", 0) * NET_QUANTUM),
+                getattr(entity, "hits", 0), int(entity.hidden),
+            )
+
+        for net_id in self.ids.values():
+            if net_id not in state:
+                self.kinds.pop(net_id, None)
+        self.ids = ids
+        return state
+
+    def receive(self):
+        """Reads every ack waiting on the socket, new clients are added the first time they send one"""
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                break
+
+            if len(data) < 7 or data[:2] != NET_ACK:
+                continue
+
+            acked, count = struct.unpack_from("<IB", data, 2)
+            if len(data) < 7 + 4 * count:
+                continue
+
+            peer = self.peers.get(address)
+            if peer is None:
+                peer = self.peers[address] = NetPeer(address)
+
+            if acked != NET_NO_BASELINE and (peer.acked is None or acked > peer.acked):
+                peer.acked = acked
+            peer.keys = KeyState(set(struct.unpack_from(f"<{count}i", data, 7)))
+            peer.last_seen = time.perf_counter()
+
+        now = time.perf_counter()
+        for address in [address for address, peer in self.peers.items() if now - peer.last_seen > self.timeout]:
+            del self.peers[address]
+
+    def send(self, entities: list):
+        """Snapshots `entities` for the current tick and sends it to every client, call this once per tick"""
+        self.receive()
+
+        sequence = self.app.ticks
+        state = self.capture(entities)
+        self.snapshots[sequence] = state
+        self.snapshots.pop(sequence - self.history, None)
+
+        encoded = {}
+        for peer in self.peers.values():
+            baseline = peer.acked if peer.acked in self.snapshots else None
+            if baseline not in encoded:
+                kinds = self.kinds
+                if baseline is not None:
+                    encoded[baseline] = encode_snapshot(state, kinds, self.snapshots[baseline], sequence - baseline)
+                else:
+                    encoded[baseline] = encode_snapshot(state, kinds)
+
+            self._send(peer.address, sequence, NET_NO_BASELINE if baseline is None else baseline, encoded[baseline])
+
+    def _send(self, address: tuple, sequence: int, baseline: int, payload: bytes):
+        size = self.mtu - struct.calcsize(NET_HEADER)
+        count = max(1, -(-len(payload) // size))
+        if count > 255:
+            raise Exception(f"Snapshot of {len(payload)} bytes needs more than 255 fragments, raise the `mtu`")
+
+        for i in range(count):
+            packet = struct.pack(NET_HEADER, NET_SNAPSHOT, sequence, baseline, i, count) + payload[i * size:(i + 1) * size]
+            try:
+                self.socket.sendto(packet, address)
+            except BlockingIOError:
+                continue
+            self.bytes_sent += len(packet)
+            self.packets_sent += 1
+
+    def keys(self, address: tuple = None) -> KeyState:
+        """What a client is holding down, the first client's if no `address`"""
+        if address is None:
+            peer = next(iter(self.peers.values()), None)
+        else:
+            peer = self.peers.get(address)
+        return peer.keys if peer else KeyState(set())
+
+    def close(self):
+        self.socket.close()
+
+
+class NetEntity(Positional):
+    """A NetClient's copy of an entity on the server"""
+    def __init__(self, app: App, net_id: int, image: str):
+        super().__init__(app)
+        self.net_id = net_id
+        self.image_name = image
+        self.object = self.image = app.load_image(image)
+        self.width, self.height = self.image.get_size()
+        self.vel_x = self.vel_y = 0.0
+        self.hits = 0
+
+
+class NetClient:
+    """Receives a NetServer's snapshots and shows them `delay` ticks late, interpolating in between snapshots so lost
+    or late packets don't make things stutter. `blits` has the NetEntities, ready for AUTO_draw.
+    Call `update` once per tick, it also acknowledges the newest snapshot and sends the keys held on this side"""
+    def __init__(self, app: App, server: tuple, *, delay: int = 3, history: int = 64):
+        self.app = app
+        self.server = server
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+        self.delay = delay
+        self.history = history
+
+        self.snapshots = {} # sequence -> state, decoded
+        self.fragments = {} # sequence -> (baseline, [payload parts])
+        self.latest = None
+        self.clock = None # the server tick being shown right now
+
+        self.kinds = {} # net id -> image name
+        self.entities = {} # net id -> NetEntity
+        self.blits = []
+
+        self.bytes_received = 0
+
+    def receive(self):
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionResetError):
+                break
+
+            header = struct.calcsize(NET_HEADER)
+            if len(data) < header or data[:2] != NET_SNAPSHOT:
+                continue
+            self.bytes_received += len(data)
+
+            _, sequence, baseline, index, count = struct.unpack_from(NET_HEADER, data)
+            if count == 0 or index >= count:
+                continue
+            if sequence in self.snapshots or (self.latest is not None and sequence <= self.latest - self.history):
+                continue
+
+            parts = self.fragments.setdefault(sequence, (baseline, [None] * count))[1]
+            if len(parts) != count:
+                continue # doesn't match the fragments we already have
+            parts[index] = data[header:]
+            if None in parts:
+                continue
+
+            del self.fragments[sequence]
+            if baseline != NET_NO_BASELINE and baseline not in self.snapshots:
+                continue # we don't have what it's a delta against anymore, a newer one will come
+
+            try:
+                state, kinds = decode_snapshot(b"".join(parts), self.snapshots.get(baseline), sequence - baseline if baseline != NET_NO_BASELINE else 0)
+            except (struct.error, IndexError, KeyError, UnicodeDecodeError):
+                continue # garbled, or not from a NetServer at all
+            self.kinds.update(kinds)
+            self.snapshots[sequence] = state
+            if self.latest is None or sequence > self.latest:
+                self.latest = sequence
+
+        if self.latest is not None:
+            for sequence in [sequence for sequence in self.snapshots if sequence <= self.latest - self.history]:
+                del self.snapshots[sequence]
+            for sequence in [sequence for sequence in self.fragments if sequence <= self.latest - self.history]:
+                del self.fragments[sequence]
+
+            # forget the image names of entities that are in none of the snapshots anymore, every so often
+            if self.latest % self.history == 0:
+                known = set().union(*self.snapshots.values())
+                self.kinds = {net_id: image for net_id, image in self.kinds.items() if net_id in known}
+
+    def acknowledge(self):
+        held = sorted(self.app.input.held_keys)[:255]
+        packet = NET_ACK + struct.pack(f"<IB{len(held)}i", NET_NO_BASELINE if self.latest is None else self.latest, len(held), *held)
+        try:
+            self.socket.sendto(packet, self.server)
+        except BlockingIOError:
+            pass
+
+    def update(self):
+        self.receive()
+        self.acknowledge()
+        if self.latest is None:
+            return
+
+        # play back `delay` ticks behind the newest snapshot, catching up if we drifted too far from that
+        target = self.latest - self.delay
+        if self.clock is None or abs(self.clock - target) > self.delay * 2:
+            self.clock = target
+        else:
+            self.clock += 1
+        self.apply(self.clock)
+
+    def apply(self, clock: int):
+        """Moves the NetEntities to where they were at server tick `clock`, interpolating between the snapshots around it"""
+        before = max((sequence for sequence in self.snapshots if sequence <= clock), default=None)
+        after = min((sequence for sequence in self.snapshots if sequence > clock), default=None)
+        if before is None:
+            before, after = after, None
+
+        state = self.snapshots[before]
+        following = self.snapshots[after] if after is not None else {}
+        t = (clock - before) / (after - before) if after is not None else 0.0
+
+        for net_id in [net_id for net_id in self.entities if net_id not in state]:
+            del self.entities[net_id]
+
+        for net_id, values in state.items():
+            entity = self.entities.get(net_id)
+            if entity is None:
+                entity = self.entities[net_id] = NetEntity(self.app, net_id, self.kinds[net_id])
+
+            x, y, vel_x, vel_y, hits, hidden = values
+            if net_id in following:
+                next_x, next_y = following[net_id][:2]
+                x += (next_x - x) * t
+                y += (next_y - y) * t
+            elif after is None:
+                # nothing newer yet, keep them going the way they were
+                x += vel_x * (clock - before)
+                y += vel_y * (clock - before)
+
+            entity.remember_pos()
+            entity.x, entity.y = x / NET_QUANTUM, y / NET_QUANTUM
+            entity.vel_x, entity.vel_y = vel_x / NET_QUANTUM, vel_y / NET_QUANTUM
+            entity.hits = hits
+            entity.hidden = bool(hidden)
+
+        self.blits = list(self.entities.values())
+
+    def close(self):
+        self.socket.close()
+
+
+MOVE_KEYS = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
 
 def KEYS_move(keys: list, player: Sprite, step: int):
-    if keys[pygame.K_UP]:
-        #player.y -= step
-        player.move(0, -step)
-    if keys[pygame.K_DOWN]:
-        #player.y += step
-        player.move(0, step)
-    if keys[pygame.K_LEFT]:
-        #player.x -= step
-        player.move(-step)
-    if keys[pygame.K_RIGHT]:
-        #player.x += step
-        player.move(step)
+    """Moves `player` by `step` for every arrow key held in `keys` (like `app.get_pressed()`)"""
+    for key, (x, y) in MOVE_KEYS.items():
+        if keys[key]:
+            player.move(x * step, y * step)
+
+def AUTO_collide(blits: list, *, cell_size: int = 32) -> list:
+    """Resolves every Bullet hit in `blits` in one pass, using a SpatialHash of the hitboxes built for this frame and
+    pixel perfect checks after that. Returns the Bullets that got spent. Bullets don't hit other Bullets here."""
+    bullets = [item for item in blits if isinstance(item, Bullet) and item.alive]
+    spent = []
+    if not bullets:
+        return spent
+
+    # only worth indexing the targets when something can hit them
+    grid = SpatialHash(cell_size)
+    for item in blits:
+        if isinstance(item, Sprite) and not isinstance(item, Bullet):
+            grid.insert(item, item.hitbox())
 
-def AUTO_blit(blits: list):
+    if not grid:
+        return spent
+
+    for bullet in bullets:
+        for target in grid.query(*bullet.hitbox()):
+            if bullet.can_hit(target) and bullet.collides(target) and not bullet.hit(target):
+                spent.append(bullet)
+                break
+
+    return spent
+
+def AUTO_step(blits: list):
+    """Steps the Bullets and ProjectileSwarms, resolves their hits and drops the spent and off-screen ones from `blits`"""
+    if not blits:
+        return
+    profiler = blits[0].app.profiler
+
+    retired = False
     for item in blits:
         if isinstance(item, Bullet):
             item.step()
-            item.check()
+            if not item.alive:
+                retired = True
+        elif isinstance(item, ProjectileSwarm):
+            item.step()
+
+    start = time.perf_counter()
+    if AUTO_collide(blits):
+        retired = True
+    profiler.add("collision", time.perf_counter() - start)
 
-        if hasattr(item, "blit"):
-            item.blit()
\ No newline at end of file
+    if retired:
+        AUTO_retire(blits)
+
+def AUTO_retire(blits: list):
+    """Drops the Projectiles that aren't alive from `blits`, giving pooled ones back to their Pool"""
+    kept = []
+    for item in blits:
+        if getattr(item, "alive", True) is False:
+            if getattr(item, "pool", None):
+                item.pool.release(item)
+        else:
+            kept.append(item)
+    blits[:] = kept
+
+def AUTO_draw(blits: list):
+    """Draws everything in `blits` through the App's RenderQueue, layer by layer"""
+    if not blits:
+        return
+    app = blits[0].app
+
+    start = time.perf_counter()
+    queue = app.render_queue
+    for item in blits:
+        if hasattr(item, "queue"):
+            item.queue(queue)
+        elif hasattr(item, "blit"):
+            item.blit() # anything that only knows how to draw itself right away
+    queue.flush()
+    app.profiler.add("blit", time.perf_counter() - start)
+
+def AUTO_blit(blits: list):
+    """Does AUTO_step and then AUTO_draw, for scenes that don't split `tick` and `draw`"""
+    AUTO_step(blits)
+    AUTO_draw(blits)
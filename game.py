@@ -10,19 +10,21 @@ class MyBulletGame(engine.App):
         super().__init__(
             title = "Das Cash Money Adventure",
             logo_filename = "catsmirk.png",
+            tick_rate = 60,
+            lazy_init = True,
         )
 
     def ready(self):
         self.load_sound("bonk.mp3", "bonk", vol=0.1)
         self.load_sound("gong.mp3", "gong", vol=0.8)
-        self.load_sound("menu.mp3", "menu")
-        self.load_sound("cats.mp3", "cats")
 
         alagard = self.load_font("alagard.ttf")
         self.font_main = alagard
 
 
 class MainMenu(engine.Menu):
+    manifest = {"music": [("menu.mp3", "menu")]}
+
     def __init__(self):
         super().__init__(
             game, "menu_main", ["New Game", "Options", "Music Room", "Cat Room", "Quit"], ["stage1", None, None, "cats", "QUIT"], 
@@ -30,71 +32,76 @@ class MainMenu(engine.Menu):
         )
 
     def ready(self):
-        self.app.play_music("menu")
+        self.app.play_music("menu", fade=1.0)
 
-    def render(self):
-        self.app.screen.fill((64, 0, 0))
-        self.app.screen.fill((128, 0, 0), rect=(50, self.app.height-120, 200, 70))
+        # get the other scenes' assets decoding while the menu is up
+        self.app.preload("cats")
+        self.app.preload("stage1")
 
-        for i in range(len(self.names)):
-            if i == self.selected:
-                color = (30, 10, 150)
-                background = (160, 0, 0)
-            else:
-                color = (250, 40, 5)
-                background = None
+    def build_ui(self):
+        ui = engine.Panel(self.app, background=(64, 0, 0))
+        ui.add(engine.Panel(self.app, pos=(50, self.app.height-120), size=(200, 70), background=(128, 0, 0)))
 
-            text = self.app.text(self.names[i], color=color, background=background)
-            text.blit((70, 70 + 30 * i))
+        self.list = ui.add(engine.ListView(
+            self.app, self.names, pos=(70, 70), size=(300, 30 * len(self.names)), row_height=30, background=(64, 0, 0),
+            color=(250, 40, 5), selected_color=(30, 10, 150), selected_background=(160, 0, 0),
+        ))
+        return ui
 
 
 class Cats(engine.Scene):
+    manifest = {"images": ["catsmirk.png"], "music": [("cats.mp3", "cats")]}
+
     def __init__(self):
         super().__init__(game, "cats")
 
     def ready(self):
+        self.swarm = engine.ProjectileSwarm(self.app, capacity=200)
+
         for _ in range(200):
             x = random.randint(100, self.app.width-100)
             y = random.randint(100, self.app.height-100)
             vel_x = random.randint(-10, 10)
             vel_y = random.randint(-10, 10)
 
-            projectile = engine.Projectile(self.app, image="catsmirk.png", pos=(x, y), velocity=(vel_x, vel_y), bounce=True)
-            self.blits.append(projectile)
+            self.swarm.add(image="catsmirk.png", pos=(x, y), velocity=(vel_x, vel_y), bounce=True)
+
+        self.blits = [self.swarm]
 
-        self.app.play_music("cats")
+        self.app.play_music("cats", fade=1.0)
 
-    def loop(self, key: int):
+    def tick(self, key: int):
         if key == pygame.K_ESCAPE:
             self.app.play_scene(main_menu)
             return
 
-        self.app.screen.fill((64, 0, 0))
+        self.swarm.step()
 
-        for sprite in self.blits:
-            if isinstance(sprite, engine.Projectile):
-                sprite.step()
-
-            sprite.blit()
+    def draw(self, alpha: float):
+        self.app.fill((64, 0, 0))
+        self.swarm.blit()
 
 
 class Stage1(engine.Scene):
+    manifest = {"images": ["catsmirk.png"]}
+
     def __init__(self):
         super().__init__(game, "stage1")
 
     def ready(self):
         self.player = engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.width//2, self.app.height//3))
+        self.player.layer = 1 # above the bullets
+        self.player.shrink = 8 # a smaller hitbox than the cat, so grazing bullets is possible
         self.blits.append(self.player)
         self.app.play_music("gong")
 
-    def loop(self, key: int):
-        self.app.screen.fill((0, 15, 64))
-        keys = pygame.key.get_pressed()
+    def tick(self, key: int):
+        keys = self.app.get_pressed()
 
         engine.KEYS_move(keys, self.player, 10)
         
         if keys[pygame.K_z]:
-            bullet = engine.Bullet(self.app, self.player, image="catsmirk.png", velocity=(0, -10), damage=-1)
+            bullet = self.app.bullets.acquire(self.player, image="catsmirk.png", velocity=(0, -10), damage=-1)
             self.blits.append(bullet)
             self.player.emit(bullet)
         if keys[pygame.K_ESCAPE]:
@@ -103,7 +110,11 @@ class Stage1(engine.Scene):
 
         self.player.restrict()
 
-        engine.AUTO_blit(self.blits)
+        engine.AUTO_step(self.blits)
+
+    def draw(self, alpha: float):
+        self.app.fill((0, 15, 64))
+        engine.AUTO_draw(self.blits)
 
 
 game = MyBulletGame()
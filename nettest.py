@@ -0,0 +1,68 @@
+import sys
+import pygame
+import engine
+
+# python nettest.py server
+# python nettest.py client 192.168.1.20
+
+class NetTest(engine.App):
+    def __init__(self):
+        super().__init__(title="net test", logo_filename="catsmirk.png", tick_rate=60)
+
+    def ready(self):
+        pass
+
+
+class Host(engine.Scene):
+    """Both players are simulated here, the second one moves with the keys the client sends"""
+    def __init__(self, game):
+        super().__init__(game, "host")
+
+    def ready(self):
+        self.server = engine.NetServer(self.app)
+        self.players = [
+            engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.width//3, self.app.height-80)),
+            engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.width*2//3, self.app.height-80)),
+        ]
+        self.blits.extend(self.players)
+
+    def tick(self, key: int):
+        for player, keys in zip(self.players, (self.app.get_pressed(), self.server.keys())):
+            engine.KEYS_move(keys, player, 6)
+            player.restrict()
+
+            if keys[pygame.K_z]:
+                self.blits.append(self.app.bullets.acquire(player, image="catsmirk.png", velocity=(0, -10)))
+
+        engine.AUTO_step(self.blits)
+        self.server.send(self.blits)
+
+    def draw(self, alpha: float):
+        self.app.fill((0, 15, 64))
+        engine.AUTO_draw(self.blits)
+
+
+class Guest(engine.Scene):
+    def __init__(self, game, address: str):
+        super().__init__(game, "guest")
+        self.address = address
+
+    def ready(self):
+        self.client = engine.NetClient(self.app, (self.address, engine.NET_PORT))
+
+    def tick(self, key: int):
+        self.client.update()
+
+    def draw(self, alpha: float):
+        self.app.fill((0, 15, 64))
+        engine.AUTO_draw(self.client.blits)
+
+
+game = NetTest()
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["client"]:
+        game.first_scene = Guest(game, sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1")
+    else:
+        game.first_scene = Host(game)
+    game.run()
@@ -1,4 +1,3 @@
-import pygame
 import engine
 import random
 
@@ -16,7 +15,7 @@ class Start(engine.Scene):
         self.player = engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.width//2, self.app.height//3))
         self.blits.append(self.player)
 
-        team = engine.Team(self.app, "collision", [self.player])
+        team = engine.Team(self.app, "collision", [self.player], cell_size=64)
 
         for _ in range(OBSTACLE_COUNT):
             obs_size = (random.randint(self.app.width//30, self.app.width//3), random.randint(self.app.height//100, self.app.height//10))
@@ -26,8 +25,8 @@ class Start(engine.Scene):
             team.add_member(obs)
 
     def loop(self, key: int):
-        self.app.screen.fill((0, 15, 64))
-        keys = pygame.key.get_pressed()
+        self.app.fill((0, 15, 64))
+        keys = self.app.get_pressed()
 
         engine.KEYS_move(keys, self.player, 10)
         
@@ -0,0 +1,103 @@
+"""Packs the images in assets/images into atlas pages, so the game loads a few big images instead of lots of small ones.
+
+python pack_atlas.py                     pack everything into assets/atlas
+python pack_atlas.py --page-size 1024 --padding 2
+
+Writes atlas0.png, atlas1.png... and atlas.json, which App.load_image reads to find images on the pages.
+Images named like walk_0.png, walk_1.png... also become the "walk" animation, see Animation.from_atlas.
+Run it again whenever the images change (and before compiling), delete assets/atlas to go back to loose images."""
+
+import os
+import re
+import json
+import argparse
+
+# has to happen before pygame gets initialized
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga", ".webp")
+FRAME_NAME = re.compile(r"^(.+)_(\d+)\.\w+$")
+
+
+def pack(sizes: dict, page_size: int, padding: int) -> tuple:
+    """Shelf packs the images, tallest first. Returns ({name: (page, x, y)}, [page sizes]) and skips images too big for a page"""
+    placed = {}
+    pages = []
+    x = y = shelf = 0
+    used_w = used_h = 0
+
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name)):
+        width, height = sizes[name]
+        if width > page_size or height > page_size:
+            print(f"{name} is bigger than a page, leaving it out")
+            continue
+
+        if x + width > page_size:
+            x, y, shelf = 0, y + shelf + padding, 0
+
+        if y + height > page_size or not pages:
+            if pages:
+                pages[-1] = (used_w, used_h)
+            pages.append(None)
+            x = y = shelf = used_w = used_h = 0
+
+        placed[name] = (len(pages) - 1, x, y)
+        used_w, used_h = max(used_w, x + width), max(used_h, y + height)
+        x += width + padding
+        shelf = max(shelf, height)
+
+    if pages:
+        pages[-1] = (used_w, used_h)
+    return placed, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packs images into atlas pages with a JSON index")
+    parser.add_argument("--images", default=os.path.join("assets", "images"), help="folder with the images to pack")
+    parser.add_argument("--out", default=os.path.join("assets", "atlas"), help="folder to write the atlas to")
+    parser.add_argument("--page-size", type=int, default=2048)
+    parser.add_argument("--padding", type=int, default=1, help="pixels between images, so scaled images don't bleed")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    images = {}
+    for filename in sorted(os.listdir(args.images)):
+        if filename.lower().endswith(IMAGE_EXTENSIONS):
+            images[filename] = pygame.image.load(os.path.join(args.images, filename)).convert_alpha()
+
+    placed, page_sizes = pack({name: image.get_size() for name, image in images.items()}, args.page_size, args.padding)
+
+    os.makedirs(args.out, exist_ok=True)
+    for filename in os.listdir(args.out):
+        if re.match(r"^atlas\d+\.png$", filename):
+            os.remove(os.path.join(args.out, filename))
+
+    pages = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+    index = {"pages": [f"atlas{i}.png" for i in range(len(pages))], "images": {}, "animations": {}}
+
+    for name, (page, x, y) in sorted(placed.items()):
+        pages[page].blit(images[name], (x, y))
+        index["images"][name] = [page, x, y, *images[name].get_size()]
+
+        match = FRAME_NAME.match(name)
+        if match:
+            index["animations"].setdefault(match[1], []).append((int(match[2]), name))
+
+    for name, frames in index["animations"].items():
+        index["animations"][name] = [filename for _, filename in sorted(frames)]
+
+    for filename, page in zip(index["pages"], pages):
+        pygame.image.save(page, os.path.join(args.out, filename))
+
+    with open(os.path.join(args.out, "atlas.json"), "w") as file:
+        json.dump(index, file, indent=1)
+
+    print(f"packed {len(placed)} images into {len(pages)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Packs the whole assets folder into one bundle file, which the App memory maps instead of reading loose files.
+
+python pack_bundle.py                    pack assets into assets.bundle
+python pack_bundle.py --no-compress      store everything as is
+python pack_bundle.py --list             show what's in assets.bundle
+
+The App uses assets.bundle whenever it's next to engine.py, so delete it (or don't pack) while working on the assets.
+Already compressed files (png, mp3, ogg...) are stored as is, since zlib can't make them any smaller."""
+
+import os
+import sys
+import zlib
+import struct
+import argparse
+
+from engine import BUNDLE_MAGIC, BUNDLE_HEADER, BUNDLE_ENTRY, Bundle
+
+STORED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".ogg", ".opus", ".flac", ".zip")
+
+
+def gather(asset_dir: str) -> list:
+    """(name in the bundle, path) for every file in `asset_dir`, names use / like App.open_asset"""
+    files = []
+    for folder, _, filenames in os.walk(asset_dir):
+        for filename in filenames:
+            path = os.path.join(folder, filename)
+            files.append((os.path.relpath(path, asset_dir).replace(os.sep, "/"), path))
+    return sorted(files)
+
+
+def pack(files: list, out: str, compress: bool, min_saving: float):
+    index = b""
+    with open(out + ".tmp", "wb") as bundle:
+        bundle.write(BUNDLE_MAGIC + struct.pack(BUNDLE_HEADER, 0, 0))
+
+        for name, path in files:
+            with open(path, "rb") as file:
+                data = file.read()
+
+            stored = data
+            if compress and not name.lower().endswith(STORED_EXTENSIONS):
+                packed = zlib.compress(data, 9)
+                if len(packed) <= len(data) * (1 - min_saving):
+                    stored = packed
+
+            encoded = name.encode()
+            index += struct.pack("<H", len(encoded)) + encoded + struct.pack(BUNDLE_ENTRY, bundle.tell(), len(stored), len(data))
+            bundle.write(stored)
+
+        index_offset = bundle.tell()
+        bundle.write(index)
+        bundle.seek(len(BUNDLE_MAGIC))
+        bundle.write(struct.pack(BUNDLE_HEADER, len(files), index_offset))
+
+    os.replace(out + ".tmp", out)
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Packs the assets folder into a single memory mappable bundle")
+    parser.add_argument("--assets", default=os.path.join(here, "assets"), help="folder to pack")
+    parser.add_argument("--out", default=os.path.join(here, "assets.bundle"))
+    parser.add_argument("--no-compress", action="store_true", help="don't zlib compress any entries")
+    parser.add_argument("--min-saving", type=float, default=0.1, help="only keep an entry compressed if it's at least this much smaller")
+    parser.add_argument("--list", action="store_true", help="list the entries of an existing bundle instead")
+    args = parser.parse_args()
+
+    if args.list:
+        bundle = Bundle(args.out)
+        for name, (offset, size, original_size) in bundle.entries.items():
+            print(f"{name:<40}{original_size:>12}{size:>12}{' zlib' if size != original_size else ''}")
+        return
+
+    if not os.path.isdir(args.assets):
+        sys.exit(f"'{args.assets}' is not a folder")
+
+    files = gather(args.assets)
+    pack(files, args.out, not args.no_compress, args.min_saving)
+    print(f"packed {len(files)} files into {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,75 @@
 import pygame
 import engine
+import random
+
+TILE_SIZE = 40
+WALL_COUNT = 400
+
+TILES = {
+    ".": (40, 110, 40),
+    "#": (90, 70, 50),
+    "~": (40, 70, 160),
+}
 
 class RPGame(engine.App):
     def __init__(self):
-        super().__init__(name="RPG Test", logo_filename="catsmirk.png")
+        super().__init__(title="RPG Test", logo_filename="catsmirk.png", world_size=(4000, 3000), tick_rate=60)
 
     def ready(self):
         pass
 
 
+class Overworld(engine.Scene):
+    def __init__(self, game):
+        super().__init__(game, "overworld")
+
+    def ready(self):
+        columns, rows = self.app.world_width // TILE_SIZE, self.app.world_height // TILE_SIZE
+        grid = [["."] * columns for _ in range(rows)]
+
+        for _ in range(WALL_COUNT):
+            length = random.randint(2, 8)
+            column, row = random.randint(0, columns-length), random.randint(0, rows-1)
+            tile = random.choice("#~")
+            for i in range(length):
+                grid[row][column+i] = tile
+
+        self.player = engine.Sprite(self.app, image="catsmirk.png", pos=(self.app.world_width//2, self.app.world_height//2))
+        self.player.layer = 1
+
+        # keep the starting spot clear
+        first_column, first_row = int(self.player.x // TILE_SIZE), int(self.player.y // TILE_SIZE)
+        for row in range(first_row, first_row + self.player.height // TILE_SIZE + 2):
+            for column in range(first_column, first_column + self.player.width // TILE_SIZE + 2):
+                grid[row][column] = "."
+
+        # the walls get baked into chunks once and only the ones on screen are drawn
+        self.map = engine.TileMap(self.app, grid, TILES, tile_size=TILE_SIZE, solid="#~")
+        engine.Team(self.app, "walls", [self.player, self.map])
+
+        self.app.camera = engine.Camera(self.app, smoothing=0.85)
+        self.app.camera.follow(self.player)
+        self.app.camera.look_at(self.player.x, self.player.y)
+
+    def tick(self, key: int):
+        engine.KEYS_move(self.app.get_pressed(), self.player, 8)
+        self.player.restrict()
+
+        # space dries up the water next to the player
+        if key == pygame.K_SPACE:
+            column, row = int(self.player.x // TILE_SIZE), int(self.player.y // TILE_SIZE)
+            for y in range(row - 2, row + 4):
+                for x in range(column - 2, column + 4):
+                    if 0 <= x < self.map.columns and 0 <= y < len(self.map.rows) and self.map.get_tile(x, y) == "~":
+                        self.map.set_tile(x, y, ".")
+
+    def draw(self, alpha: float):
+        engine.AUTO_draw([self.map, self.player])
+
+
+game = RPGame()
+overworld = Overworld(game)
+game.first_scene = overworld
+
+if __name__ == "__main__":
+    game.run()